@@ -1,45 +1,23 @@
 import streamlit as st
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
+import bankimport
+import batchinvoer
+import bedragen
+import grootboek
+import rapportage
 
 # ----------------------
 # CONFIGURATIE
 # ----------------------
 SHEET_NAAM = "Boekhouding_Rick"
 TABBLAD_NAAM = "Blad1"
-SERVICE_ACCOUNT_INFO = st.secrets["gcp_service_account"]
-
-scope = [
-    "https://spreadsheets.google.com/feeds",
-    "https://www.googleapis.com/auth/drive"
-]
-creds = Credentials.from_service_account_info(SERVICE_ACCOUNT_INFO, scopes=scope)
-client = gspread.authorize(creds)
-sheet = client.open(SHEET_NAAM).worksheet(TABBLAD_NAAM)
 
 # ----------------------
 # BESTAANDE DATA INLEZEN
 # ----------------------
-data = sheet.get_all_records()
-if not data:
-    df = pd.DataFrame(columns=["Datum", "Categorie", "Bedrag", "Omschrijving", "Soort"])
-else:
-    df = pd.DataFrame(data)
-    # Zorg dat datum kolom strings in dd-mm-yyyy zijn
-    if "Datum" in df.columns:
-        df["Datum"] = pd.to_datetime(
-            df["Datum"],
-            dayfirst=True,
-            errors='coerce'
-        )
-    # Zorg dat alle kolommen aanwezig zijn
-    for col in ["Categorie", "Omschrijving", "Soort", "Bedrag"]:
-        if col not in df.columns:
-            if col == "Bedrag":
-                df[col] = 0.0
-            else:
-                df[col] = ""
+# De app werkt op een lokale kopie; een achtergrondproces synchroniseert
+# met de Google Sheet (zie grootboek.py)
+boek = grootboek.open_grootboek(SHEET_NAAM, TABBLAD_NAAM)
+aantal_transacties = boek.aantal()
 
 # ----------------------
 # SESSION STATE INIT
@@ -67,8 +45,11 @@ type_last = st.radio(
     ["Vaste last", "Variabel"]
 )
 
+# Keuzelijsten komen uit een index die per dataversie één keer wordt opgebouwd
+keuzes = boek.keuze_index()
+
 # Categorieën
-bestaande_categorieen = sorted(df["Categorie"].dropna().unique().tolist())
+bestaande_categorieen = keuzes.categorieen
 categorie_select = st.selectbox(
     "Kies een categorie (of selecteer 'Nieuwe categorie')",
     ["Nieuwe categorie"] + bestaande_categorieen,
@@ -81,16 +62,9 @@ else:
 
 # Omschrijving (afhankelijk van categorie)
 if categorie_select != "Nieuwe categorie":
-    bestaande_omschrijving = (
-        df.loc[df["Categorie"] == categorie_select, "Omschrijving"]
-        .dropna()
-        .unique()
-        .tolist()
-    )
+    bestaande_omschrijving = keuzes.omschrijvingen_bij(categorie_select)
 else:
-    bestaande_omschrijving = df["Omschrijving"].dropna().unique().tolist()
-
-bestaande_omschrijving = sorted(bestaande_omschrijving)
+    bestaande_omschrijving = keuzes.omschrijvingen
 
 omschrijving_select = st.selectbox(
     "Kies een omschrijving (of selecteer 'Nieuwe omschrijving')",
@@ -103,6 +77,24 @@ if omschrijving_select == "Nieuwe omschrijving":
 else:
     omschrijving = omschrijving_select
 
+# Categorie voorstellen op basis van eerdere transacties met deze omschrijving
+def gebruik_suggestie(suggestie, omschrijving):
+    st.session_state.categorie_select = suggestie
+    if omschrijving in keuzes.omschrijvingen_bij(suggestie):
+        st.session_state.omschrijving_select = omschrijving
+    else:
+        st.session_state.omschrijving_select = "Nieuwe omschrijving"
+        st.session_state.omschrijving_nieuw = omschrijving
+
+if categorie_select == "Nieuwe categorie" and omschrijving:
+    suggestie = boek.categorisator().suggestie(omschrijving)
+    if suggestie:
+        st.button(
+            f"Voorgestelde categorie: {suggestie}",
+            on_click=gebruik_suggestie,
+            args=(suggestie, omschrijving)
+        )
+
 # Bedrag
 bedrag = st.number_input(
     "Bedrag (€)",
@@ -123,39 +115,22 @@ transactietype = st.radio(
 # ----------------------
 # OPSLAAN FUNCTIE
 # ----------------------
-def opslaan():
+def opslaan(datum, categorie, omschrijving, bedrag, transactietype, type_last):
     if not categorie:
         st.warning("Vul een categorie in.")
         return
 
-    # Correcte float en negatieve waarde bij uitgave
-    bedrag_final = float(bedrag)
-    if transactietype == "Uitgave":
-        bedrag_final *= -1
-    # Afronden op 2 decimalen
-    bedrag_final = round(bedrag_final, 2)
-
-    # Nieuwe rij als lijst, datum als string dd-mm-yyyy
-    nieuwe_rij = [
-        datum.strftime("%d-%m-%Y"),
-        categorie,
-        bedrag_final,
-        omschrijving,
-        type_last
-    ]
-
-    # Voeg nieuwe rij toe aan Google Sheet (append)
-    sheet.append_row(nieuwe_rij, value_input_option="USER_ENTERED")
-
-    # Voeg toe aan lokale DataFrame
-    global df
-    df = pd.concat([df, pd.DataFrame([{
-        "Datum": nieuwe_rij[0],
-        "Categorie": nieuwe_rij[1],
-        "Bedrag": nieuwe_rij[2],
-        "Omschrijving": nieuwe_rij[3],
-        "Soort": nieuwe_rij[4]
-    }])], ignore_index=True)
+    # Hele centen, negatief bij uitgave
+    bedrag_final = int(bedragen.met_teken(bedragen.euro_naar_centen(bedrag), transactietype))
+
+    # Nieuwe rij lokaal opslaan; de sync stuurt hem door naar de Google Sheet
+    boek.voeg_toe([{
+        "Datum": datum,
+        "Categorie": categorie,
+        "Bedrag": bedrag_final,
+        "Omschrijving": omschrijving,
+        "Soort": type_last
+    }])
 
     st.success(
         f"Gegevens opgeslagen! Categorie '{categorie}', omschrijving '{omschrijving}' en soort '{type_last}' toegevoegd."
@@ -169,78 +144,163 @@ def opslaan():
     st.session_state.bedrag = 0.0
     st.session_state.transactietype = "Uitgave"
 
-st.button("Opslaan", on_click=opslaan)
+# Waarden van deze run meegeven: de callback draait pas bij de volgende run,
+# en globale namen kunnen verderop in de pagina een andere waarde krijgen
+st.button("Opslaan", on_click=opslaan,
+          args=(datum, categorie, omschrijving, bedrag, transactietype, type_last))
 
-import re
-
-def europees_getal_naar_float(value):
-    """
-    Zet een waarde om naar float met Europese notatie:
-    - Als float/int: gewoon behouden
-    - Als string:
-        - Komma aanwezig: vervang door punt
-        - Geen komma: interpreteer als centen (laatste 2 cijfers decimaal)
-    """
-    import re
-
-    if value is None:
-        return 0.0
-
-    # Float/int behouden
-    if isinstance(value, (float, int)):
-        return float(value)
-
-    # Anders string
-    s = str(value).strip()
-    if s == "":
-        return 0.0
-
-    # Alleen cijfers, punt, komma
-    s = re.sub(r"[^\d,\.]", "", s)
+# ----------------------
+# MEERDERE TRANSACTIES TEGELIJK
+# ----------------------
+if "batch_teller" not in st.session_state:
+    st.session_state.batch_teller = 0
+
+with st.expander("Meerdere transacties tegelijk invoeren"):
+    st.markdown(
+        "Plak regels uit Excel of een CSV-bestand met de kolommen "
+        "`Datum; Categorie; Omschrijving; Bedrag; Transactietype; Soort`, "
+        "of vul de tabel hieronder aan. Een negatief bedrag zonder "
+        "transactietype telt als uitgave; een lege categorie wordt waar "
+        "mogelijk voorgesteld op basis van de omschrijving."
+    )
+    geplakt = st.text_area("Regels plakken", key=f"batch_tekst_{st.session_state.batch_teller}")
+    upload = st.file_uploader("Of upload een CSV-bestand", type=["csv", "txt"],
+                              key=f"batch_csv_{st.session_state.batch_teller}")
+    bron = upload.getvalue().decode("utf-8-sig") if upload is not None else geplakt
+
+    batch = st.data_editor(
+        batchinvoer.lees_tekst(bron, boek.categorisator()),
+        num_rows="dynamic",
+        hide_index=True,
+        column_config={
+            "Datum": st.column_config.DateColumn("Datum", format="DD-MM-YYYY"),
+            "Bedrag": st.column_config.NumberColumn("Bedrag (€)", min_value=0.0, step=0.01, format="%.2f"),
+            "Transactietype": st.column_config.SelectboxColumn("Transactietype", options=batchinvoer.TRANSACTIETYPES),
+            "Soort": st.column_config.SelectboxColumn("Soort", options=batchinvoer.SOORTEN),
+        },
+        key=f"batch_editor_{st.session_state.batch_teller}_{hash(bron)}"
+    )
+    batch_rijen, batch_fouten = batchinvoer.valideer(batch)
+    if not batch_fouten.empty:
+        st.error("Niet alle regels zijn geldig:")
+        st.dataframe(batch_fouten, hide_index=True)
+
+    def batch_opslaan(rijen):
+        # Alle regels in één keer lokaal; de sync stuurt ze met één append_rows door
+        boek.voeg_toe(rijen)
+        st.success(f"{len(rijen)} transacties opgeslagen.")
+        st.session_state.batch_teller += 1
+
+    st.button(
+        f"{len(batch_rijen)} transacties opslaan",
+        on_click=batch_opslaan,
+        args=(batch_rijen,),
+        disabled=not batch_rijen
+    )
 
-    if "," in s:
-        # Europese notatie, vervang komma door punt, verwijder duizendtallen
-        s = s.replace(".", "")
-        s = s.replace(",", ".")
+# ----------------------
+# BANKAFSCHRIFT IMPORTEREN
+# ----------------------
+with st.expander("Bankafschrift importeren"):
+    st.markdown(
+        "CSV-export van ING, Rabobank of ABN AMRO, MT940 (.sta) of CAMT.053 (.xml). "
+        "Transacties die al in het overzicht staan worden overgeslagen. Nieuwe "
+        "transacties krijgen de categorie van eerdere transacties met dezelfde "
+        f"omschrijving, anders `{bankimport.STANDAARD_CATEGORIE}`."
+    )
+    afschrift = st.file_uploader(
+        "Bankbestand",
+        type=["csv", "txt", "tab", "sta", "940", "mt940", "xml", "053"],
+        key=f"bank_bestand_{st.session_state.batch_teller}"
+    )
+    if afschrift is not None and st.button("Importeren"):
         try:
-            return float(s)
-        except:
-            return 0.0
-    else:
-        # Geen komma: interpreteer als centen als > 100
-        s_num = int(s)
-        if s_num < 100:
-            # minder dan 1 euro, bijv. "50" = 0,50
-            return s_num / 100
+            with st.spinner("Bezig met importeren..."):
+                nieuw, dubbel, onleesbaar = bankimport.importeer(boek, afschrift, afschrift.name)
+        except ValueError as fout:
+            st.error(str(fout))
         else:
-            # laatste twee cijfers decimaal
-            s = s.zfill(3)
-            return float(s[:-2] + "." + s[-2:])
+            st.success(f"{nieuw} transacties geïmporteerd, {dubbel} al aanwezig en overgeslagen.")
+            if onleesbaar:
+                st.warning(f"{onleesbaar} transacties overgeslagen: het bedrag is onleesbaar.")
 
 # ----------------------
 # OVERZICHT
 # ----------------------
 st.subheader("Overzicht ingevoerde data")
-if df.empty:
+if aantal_transacties == 0:
     st.info("Er zijn nog geen gegevens ingevoerd.")
 else:
-    df_preview = df.copy()
-
-    # Datum als dd-mm-yyyy
-    if "Datum" in df_preview.columns:
-        df_preview["Datum"] = pd.to_datetime(
-            df_preview["Datum"],
-            dayfirst=True,
-            errors='coerce'
-        ).dt.strftime("%d-%m-%Y")
-
-
-    # Bedrag: altijd float, 2 decimalen, komma als decimaal
-    if "Bedrag" in df_preview.columns:
-        df_preview["Bedrag"] = df_preview["Bedrag"].astype(float)/100
-        df_preview["Bedrag"] = df_preview["Bedrag"].apply(lambda x: f"{x:.2f}".replace(".", ","))
-
-    # Sorteer op datum (nieuwste eerst)
-    df_sorted = df_preview.sort_values(by="Datum", ascending=False)
+    # Filteren, sorteren en pagineren gebeurt in het grootboek (SQLite); alleen
+    # de zichtbare pagina wordt opgemaakt en naar de browser gestuurd
+    kolom_datum, kolom_categorie = st.columns(2)
+    periode = kolom_datum.date_input("Periode", value=(), format="DD-MM-YYYY")
+    filter_categorie = kolom_categorie.selectbox(
+        "Categorie", ["Alle categorieën"] + keuzes.categorieen, key="filter_categorie"
+    )
+    kolom_min, kolom_max, kolom_aantal = st.columns(3)
+    bedrag_min = kolom_min.number_input("Bedrag vanaf (€)", min_value=0.0, step=1.0, value=None)
+    bedrag_max = kolom_max.number_input("Bedrag tot en met (€)", min_value=0.0, step=1.0, value=None)
+    per_pagina = kolom_aantal.selectbox("Regels per pagina", [25, 50, 100, 250], index=1)
+
+    filters = {
+        "datum_van": periode[0] if len(periode) > 0 else None,
+        "datum_tot": periode[1] if len(periode) > 1 else None,
+        "categorie": None if filter_categorie == "Alle categorieën" else filter_categorie,
+        "bedrag_min": None if bedrag_min is None else bedragen.euro_naar_centen(bedrag_min),
+        "bedrag_max": None if bedrag_max is None else bedragen.euro_naar_centen(bedrag_max),
+    }
+    totaal = boek.aantal(**filters)
+    aantal_paginas = max((totaal + per_pagina - 1) // per_pagina, 1)
+    nummer = st.number_input(f"Pagina (van {aantal_paginas})", min_value=1,
+                             max_value=aantal_paginas, step=1)
+    pagina = boek.pagina(nummer, per_pagina, **filters)
+
+    if pagina.empty:
+        st.info("Geen transacties gevonden met deze filters.")
+    else:
+        eerste = (nummer - 1) * per_pagina + 1
+        st.caption(f"Transactie {eerste}–{eerste + len(pagina) - 1} van {totaal} (nieuwste eerst)")
+        # Datum als dd-mm-yyyy, Bedrag (centen) als tekst met komma
+        pagina["Datum"] = pagina["Datum"].dt.strftime("%d-%m-%Y")
+        pagina["Bedrag"] = bedragen.centen_naar_tekst(pagina["Bedrag"])
+        st.dataframe(pagina, hide_index=True)
 
-    st.dataframe(df_sorted, hide_index=True)
+# ----------------------
+# RAPPORTAGE
+# ----------------------
+if aantal_transacties:
+    st.subheader("Rapportage")
+    # Eén keer per dataversie berekend; daarna komt alles uit de cache
+    rapport = rapportage.rapport(boek, (boek.pad, boek.versie()))
+    euro = st.column_config.NumberColumn(format="€ %.2f")
+
+    tab_maand, tab_categorie, tab_soort, tab_saldo = st.tabs(
+        ["Per maand", "Per categorie", "Vast / variabel", "Saldo"]
+    )
+    with tab_maand:
+        maand = rapportage.in_euro(rapport["maand"])
+        st.bar_chart(maand[["Inkomsten", "Uitgaven"]], stack=False)
+        st.dataframe(
+            maand.sort_index(ascending=False),
+            column_config={"Maand": st.column_config.DateColumn(format="MM-YYYY"),
+                           "Inkomsten": euro, "Uitgaven": euro, "Netto": euro}
+        )
+    with tab_categorie:
+        per_categorie = rapport["categorie"]
+        per_categorie = per_categorie.assign(Totaal=per_categorie["Totaal"] / 100,
+                                             Gemiddeld=per_categorie["Gemiddeld"] / 100)
+        st.dataframe(per_categorie, column_config={"Totaal": euro, "Gemiddeld": euro})
+        st.dataframe(
+            rapportage.in_euro(rapport["categorie_per_maand"]).sort_index(ascending=False),
+            column_config={"Maand": st.column_config.DateColumn(format="MM-YYYY")}
+        )
+    with tab_soort:
+        soort = rapportage.in_euro(rapport["soort"])
+        st.bar_chart(soort)
+        st.dataframe(
+            soort.sort_index(ascending=False),
+            column_config={"Maand": st.column_config.DateColumn(format="MM-YYYY")}
+        )
+    with tab_saldo:
+        st.line_chart(rapportage.in_euro(rapport["saldo"]))
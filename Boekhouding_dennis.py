@@ -1,35 +1,21 @@
 import streamlit as st
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-from gspread_dataframe import get_as_dataframe, set_with_dataframe
+import bedragen
+import grootboek
 
 # ----------------------
 # CONFIGURATIE
 # ----------------------
 SHEET_NAAM = "Boekhouding_Dennis"
 TABBLAD_NAAM = "Blad1"
-SERVICE_ACCOUNT_INFO = st.secrets["gcp_service_account"]
 
-# Maak credentials
-scope = ["https://spreadsheets.google.com/feeds",
-         "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_info(SERVICE_ACCOUNT_INFO, scopes=scope)
-client = gspread.authorize(creds)
-
-# Open Google Sheet
-sheet = client.open(SHEET_NAAM).worksheet(TABBLAD_NAAM)
-
-# Laad bestaande data
-df = get_as_dataframe(sheet)
-if df is None or df.empty:
-    df = pd.DataFrame(columns=["Datum", "Categorie", "Bedrag", "Omschrijving"])
-else:
-    df["Datum"] = pd.to_datetime(df["Datum"])
-    if "Omschrijving" not in df.columns:
-        df["Omschrijving"] = ""
-    if "Bedrag" not in df.columns:
-        df.rename(columns={"Waarde": "Bedrag"}, inplace=True)
+# Laad bestaande data uit de lokale kopie (zie grootboek.py)
+boek = grootboek.open_grootboek(
+    SHEET_NAAM, TABBLAD_NAAM,
+    datum_formaat="%Y-%m-%d %H:%M:%S",
+    dayfirst=False,
+    bedrag_in_centen=False
+)
+aantal_transacties = boek.aantal()
 
 # ----------------------
 # SESSION STATE INIT
@@ -55,9 +41,11 @@ st.title("Boekhouding Dennis Kats")
 # Datum invoer
 datum = st.date_input("Datum")
 
+# Keuzelijsten uit de index (per dataversie één keer opgebouwd)
+keuzes = boek.keuze_index()
+
 # Dropdown categorieën
-bestaande_categorieen = df["Categorie"].dropna().unique().tolist()
-bestaande_categorieen.sort()
+bestaande_categorieen = keuzes.categorieen
 categorie_select = st.selectbox(
     "Kies een categorie (of selecteer 'Nieuwe categorie')",
     ["Nieuwe categorie"] + bestaande_categorieen,
@@ -69,8 +57,7 @@ else:
     categorie = st.session_state.categorie_select
 
 # Dropdown omschrijving
-bestaande_omschrijving = df["Omschrijving"].dropna().unique().tolist()
-bestaande_omschrijving.sort()
+bestaande_omschrijving = keuzes.omschrijvingen
 omschrijving_select = st.selectbox(
     "Kies een omschrijving (of selecteer 'Nieuwe omschrijving')",
     ["Nieuwe omschrijving"] + bestaande_omschrijving,
@@ -104,29 +91,17 @@ def opslaan():
         return
     
     # Pas bedrag aan op basis van type
-    bedrag_final = bedrag * (-1 if transactietype == "Uitgave" else 1)
+    bedrag_final = bedragen.euro_naar_centen(bedrag) * (-1 if transactietype == "Uitgave" else 1)
 
-    nieuwe_rij = {
-        "Datum": pd.to_datetime(datum),
+    # Lokaal opslaan; de sync voegt de rij achteraan de Google Sheet toe
+    boek.voeg_toe([{
+        "Datum": datum,
         "Categorie": categorie,
         "Bedrag": bedrag_final,
         "Omschrijving": omschrijving
-    }
-    global df
-    df = pd.concat([df, pd.DataFrame([nieuwe_rij])], ignore_index=True)
-    
-    # Schrijf terug naar Google Sheet
-    set_with_dataframe(sheet, df)
-    
-    st.success(f"Gegevens opgeslagen! Categorie '{categorie}' en omschrijving '{omschrijving}' toegevoegd indien nieuw.")
+    }])
 
-    # Update dropdowns in huidige sessie
-    if categorie not in bestaande_categorieen:
-        bestaande_categorieen.append(categorie)
-        bestaande_categorieen.sort()
-    if omschrijving not in bestaande_omschrijving:
-        bestaande_omschrijving.append(omschrijving)
-        bestaande_omschrijving.sort()
+    st.success(f"Gegevens opgeslagen! Categorie '{categorie}' en omschrijving '{omschrijving}' toegevoegd indien nieuw.")
 
     # Reset velden na opslaan
     st.session_state.categorie_select = "Nieuwe categorie"
@@ -141,8 +116,15 @@ st.button("Opslaan", on_click=opslaan)
 
 # Overzicht van data
 st.subheader("Overzicht ingevoerde data")
-if df.empty:
+if aantal_transacties == 0:
     st.info("Er zijn nog geen gegevens ingevoerd.")
 else:
-    df_sorted = df.sort_values(by="Datum", ascending=False)
-    st.dataframe(df_sorted)
+    # Sorteren en pagineren gebeurt in het grootboek; alleen de zichtbare
+    # pagina wordt opgemaakt
+    per_pagina = 100
+    aantal_paginas = (aantal_transacties + per_pagina - 1) // per_pagina
+    nummer = st.number_input(f"Pagina (van {aantal_paginas})", min_value=1,
+                             max_value=aantal_paginas, step=1)
+    pagina = boek.pagina(nummer, per_pagina)[["Datum", "Categorie", "Bedrag", "Omschrijving"]]
+    pagina["Bedrag"] = bedragen.centen_naar_tekst(pagina["Bedrag"])
+    st.dataframe(pagina)
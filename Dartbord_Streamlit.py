@@ -1,155 +1,67 @@
 import streamlit as st
-import random
-import matplotlib.pyplot as plt
-import numpy as np
-import gspread
-from google.oauth2.service_account import Credentials
+import os
+import streamlit.components.v1 as components
+import dartbord_geometrie as geo
+import dartbord_svg
+import dartdoelen
+from schrijfbuffer import Schrijfbuffer
+from dartstatistiek import Dartstatistiek
 from datetime import datetime
-import pandas as pd
 
 # ----------------------
-# Dartbord instellingen en hulpfuncties
+# Dartbord hulpfuncties (geometrie en tekenen: dartbord_geometrie.py)
 # ----------------------
-ring_radii = {
-    "Double": (9.5, 10),
-    "Single boven": (6, 9.5),
-    "Triple": (5.5, 6),
-    "Single onder": (1.25, 5.5),
-    "Outer Bull": (1.5, 1.25),
-    "Bullseye": (0, 0.6)
-}
-
-dartbord_volgorde = [20,1,18,4,13,6,10,15,2,17,3,19,7,16,8,11,14,9,12,5]
-
-def get_type(vak):
-    vak_lower = vak.lower()
-    if vak_lower.startswith("single") and "onder" in vak_lower:
-        return "Single onder"
-    elif vak_lower.startswith("single") and "boven" in vak_lower:
-        return "Single boven"
-    elif vak_lower.startswith("double"):
-        return "Double"
-    elif vak_lower.startswith("triple"):
-        return "Triple"
-    elif "outer bull" in vak_lower:
-        return "Outer Bull"
-    elif "bullseye" in vak_lower:
-        return "Bullseye"
-    else:
-        raise ValueError(f"Onbekend vak: {vak}")
-
 def get_focus_display_name(vak):
     return vak
 
 # ----------------------
-# Functie voor dartbord met accent
+# Dartbord met accent (SVG in de browser, zie dartbord_svg.py)
 # ----------------------
-def teken_dartbord(focus_vak=None):
-    sectoren = range(20)
-    fig, ax = plt.subplots(figsize=(8,8), subplot_kw={'polar': True})
-    ax.set_theta_offset(np.pi/2)
-    ax.set_theta_direction(-1)
-    ax.set_ylim(0, 10)
-    theta_width = 2*np.pi / 20
-
-    # kleurenpatroon per sector
-    kleuren_pattern = [
-        [(1,0,0), (0,0,0), (1,0,0), (0,0,0)],       # rood-zwart
-        [(0,0.5,0), (0.96,0.96,0.86), (0,0.5,0), (0.96,0.96,0.86)]  # groen-beige
-    ]
-
-    # Sectoren & ringen
-    for i, s in enumerate(sectoren):
-        # ✔️ Gebruik nu het ECHTE dartnummer
-        nummer = dartbord_volgorde[i]
-
-        vakken_in_sector = [
-            f"Double {nummer}",
-            f"Single {nummer} boven",
-            f"Triple {nummer}",
-            f"Single {nummer} onder"
-        ]
-
-        pattern = kleuren_pattern[i % 2]
-
-        for j, vak in enumerate(vakken_in_sector):
-            vak_type = get_type(vak)
-            r_start, r_end = ring_radii[vak_type]
-
-            # Accent: blauw + goud
-            if vak == focus_vak:
-                color = (0,0,1)  # blauw
-                edge = 'gold'
-                lw = 2
-            else:
-                color = pattern[j]
-                edge = 'black'
-                lw = 0.5
-
-            ax.bar(
-                i*theta_width,
-                r_end - r_start,
-                width=theta_width*0.95,
-                bottom=r_start,
-                color=color,
-                edgecolor=edge,
-                linewidth=lw
-            )
-
-    # ✔️ Bulls (bull & single bull blauw bij focus)
-    for vak, radius in [("Outer Bull", ring_radii["Outer Bull"]), ("Bullseye", ring_radii["Bullseye"])]:
-        r_start, r_end = radius
-
-        # Normale kleuren (groen / rood)
-        normale_kleur = (0,1,0) if vak == "Outer Bull" else (1,0,0)
-
-        if vak == focus_vak:
-            circle_color = (0,0,1)   # blauw
-            edge_color = 'gold'
-            lw = 2
-        else:
-            circle_color = normale_kleur
-            edge_color = 'black'
-            lw = 0.5
-
-        circle = plt.Circle(
-            (0,0),
-            r_end,
-            transform=ax.transData._b,
-            color=circle_color,
-            ec=edge_color,
-            linewidth=lw
-        )
-        ax.add_artist(circle)
+@st.cache_resource(show_spinner=False)
+def dartbord_component():
+    """Het bord staat als statische SVG in de frontend; de server stuurt per
+    vak alleen het vaknummer, de browser zet het accent."""
+    return components.declare_component("dartbord", path=dartbord_svg.schrijf_frontend())
 
-    # Nummering rondom bord
-    for i, nummer in enumerate(dartbord_volgorde):
-        theta = (i * theta_width) + (theta_width / 2) - (2*np.pi / 40)
-        ax.text(theta, 10.7, str(nummer), ha='center', va='center', fontsize=14, fontweight='bold')
-
-    ax.set_xticks([])
-    ax.set_yticks([])
-    plt.title(get_focus_display_name(focus_vak), pad=30, fontsize=18, fontweight='bold')
-    return fig
+def toon_dartbord(focus_vak):
+    # Vaste key: het iframe blijft staan en krijgt alleen nieuwe argumenten
+    dartbord_component()(vak=geo.VAK_INDEX.get(focus_vak, -1), key="dartbord", default=None)
 
 # ----------------------
 # CONFIGURATIE GOOGLE SHEET
 # ----------------------
 SHEET_NAAM = "Dartapp"
 TABBLAD_NAAM = "Blad1"
-SERVICE_ACCOUNT_INFO = st.secrets["gcp_service_account"]
 
-scope = ["https://spreadsheets.google.com/feeds",
-         "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_info(SERVICE_ACCOUNT_INFO, scopes=scope)
-client = gspread.authorize(creds)
-sheet = client.open(SHEET_NAAM).worksheet(TABBLAD_NAAM)
+# Sessies die (nog) niet in de sheet staan; zie schrijfbuffer.py
+JOURNAAL_PAD = os.path.join(".data", "dartbord_wachtrij.jsonl")
 
 # ----------------------
 # FUNCTIE OM DATA OP TE SLAAN
 # ----------------------
-def sla_data_op(naam, vak, aantal_pijlen, timestamp):
-    sheet.append_row([naam, timestamp, vak, aantal_pijlen])
+@st.cache_resource(show_spinner=False)
+def schrijfbuffer():
+    # Eén buffer per proces; een sessie is herkenbaar aan naam + tijdstip
+    return Schrijfbuffer(SHEET_NAAM, TABBLAD_NAAM, JOURNAAL_PAD, sleutel=lambda rij: (rij[0], rij[1]))
+
+def sla_sessie_op(naam, entries, timestamp):
+    """Alle worpen van een sessie in één append_rows."""
+    rijen = [[naam, timestamp, entry['vak'], entry['waarde']] for entry in entries]
+    return schrijfbuffer().voeg_toe(rijen)
+
+# ----------------------
+# STATISTIEKEN (incrementeel, zie dartstatistiek.py)
+# ----------------------
+@st.cache_resource(show_spinner=False)
+def dartstatistiek():
+    return Dartstatistiek(SHEET_NAAM, TABBLAD_NAAM)
+
+def actuele_statistiek(forceer=False):
+    stats = dartstatistiek()
+    stats.bijwerken(forceer)
+    # Nog niet verstuurde sessies tellen gewoon mee in de overzichten
+    stats.voeg_voorlopig_toe([[str(cel) for cel in rij] for rij in schrijfbuffer().wachtend()])
+    return stats
 
 # ----------------------
 # SESSION STATE INIT
@@ -166,9 +78,10 @@ if 'ingevulde_waarden' not in st.session_state:
 # ----------------------
 if st.session_state.pagina == 1 or st.session_state.pagina is None:
     try:
-        alle_rows = sheet.get_all_values()[1:]
-        bestaande_namen = sorted(list(set(row[0] for row in alle_rows if row[0])))
+        stats = actuele_statistiek()
+        bestaande_namen = stats.namen()
     except:
+        stats = None
         bestaande_namen = []
 
     st.title("Welkom bij de Dartbord App")
@@ -197,6 +110,14 @@ if st.session_state.pagina == 1 or st.session_state.pagina is None:
     if gekozen_naam == "Zelf je naam invoeren":
         st.text_input("Voer je naam in:", key="tekst_naam")
 
+    soort_ronde = st.radio(
+        "Soort ronde:",
+        ["Willekeurig", "Even moeilijk", "Op maat"],
+        horizontal=True,
+        help="Even moeilijk: elke ronde heeft ongeveer dezelfde totale moeilijkheid. "
+             "Op maat: vakken waar je veel pijlen voor nodig hebt komen vaker voor.",
+    )
+
     def start_app():
         naam = st.session_state.tekst_naam if gekozen_naam == "Zelf je naam invoeren" else gekozen_naam
         if not naam.strip():
@@ -206,19 +127,20 @@ if st.session_state.pagina == 1 or st.session_state.pagina is None:
         st.session_state.naam = naam
         st.session_state.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        aantal_totaal_vakken = 20
-        alle_vakken = []
-        for n in range(1,21):
-            alle_vakken.extend([f"Double {n}", f"Single {n} boven", f"Triple {n}", f"Single {n} onder"])
-        alle_vakken.extend(["Outer Bull","Bullseye"])
-
-        verplichte_vakken = ["Triple 20", random.choice(["Bullseye","Outer Bull"])]
-        overige_vakken = list(set(alle_vakken) - set(verplichte_vakken))
-        aantal_overige = aantal_totaal_vakken - len(verplichte_vakken)
-        random_vakken = random.sample(overige_vakken, aantal_overige)
-
-        st.session_state.vakken = verplichte_vakken + random_vakken
-        random.shuffle(st.session_state.vakken)
+        # Triple 20 en een bull zitten altijd in de ronde; zie dartdoelen.py
+        verplicht = dartdoelen.standaard_verplicht()
+        if soort_ronde == "Even moeilijk" and stats is not None:
+            # Moeilijkheid = verwacht aantal pijlen per vak uit de geschiedenis
+            scores = stats.verwacht_per_vak()
+            sessie = dartdoelen.sessie_met_moeilijkheid(
+                dartdoelen.standaard_doel(scores), scores=scores, verplicht=verplicht
+            )
+        elif soort_ronde == "Op maat" and stats is not None:
+            gewichten = stats.verwacht_per_vak(naam)
+            sessie = dartdoelen.trek_sessies(1, verplicht=verplicht, gewichten=gewichten)[0]
+        else:
+            sessie = dartdoelen.trek_sessies(1, verplicht=verplicht)[0]
+        st.session_state.vakken = dartdoelen.vaknamen(sessie)
 
         st.session_state.index = 0
         st.session_state.pagina = 2
@@ -229,18 +151,12 @@ if st.session_state.pagina == 1 or st.session_state.pagina is None:
     # Overzicht beste totaalscore
     # ----------------------
     st.subheader("🎯 Beste totaalscore per persoon")
-    totals = {}
-    for r in alle_rows:
-        naam, ts, vak, aantal = r
-        aantal = int(aantal)
-        totals.setdefault(naam, {}).setdefault(ts, 0)
-        totals[naam][ts] += aantal
-
-    min_scores = [[naam, min(sessies.values())] for naam, sessies in totals.items()]
-    df_totals = pd.DataFrame(min_scores, columns=["Naam", "Totaal worpen (minimaal)"])
-    df_totals = df_totals.sort_values("Totaal worpen (minimaal)", ascending=True)
-    df_totals.insert(0, "Positie", range(1, len(df_totals) + 1))
-    st.dataframe(df_totals, use_container_width=True, hide_index=True)
+    if stats is not None:
+        genormaliseerd = st.toggle(
+            "Corrigeer voor moeilijkheid van de vakken", value=True, key="ranglijst_genormaliseerd",
+            help="Je totaal gedeeld door het verwachte totaal voor jouw 20 vakken. 1,00 = gemiddeld, lager is beter."
+        )
+        st.dataframe(stats.ranglijst(genormaliseerd), use_container_width=True, hide_index=True)
 
     def ga_naar_statistieken():
         st.session_state.pagina = 3
@@ -258,11 +174,10 @@ if st.session_state.pagina == 2:
         st.session_state.pagina = 2.5
     else:
         focus_vak = vakken[idx]
-        fig = teken_dartbord(focus_vak)
         col1, col2 = st.columns([6,2])
 
         with col1:
-            st.pyplot(fig, use_container_width=False)
+            toon_dartbord(focus_vak)
 
         with col2:
             # Totaal berekenen
@@ -355,7 +270,10 @@ if st.session_state.pagina == 2.5:
     def bevestig_worpen():
         for idx, entry in enumerate(st.session_state.ingevulde_waarden):
             entry['waarde'] = st.session_state.pijlen_data[idx]
-            sla_data_op(st.session_state.naam, entry['vak'], entry['waarde'], st.session_state.timestamp)
+        # Na een geslaagde verzending direct de sheet opnieuw bekijken
+        st.session_state.verstuurd = st.session_state.ververs = sla_sessie_op(
+            st.session_state.naam, st.session_state.ingevulde_waarden, st.session_state.timestamp
+        )
         st.session_state.pagina = 3
 
     st.button("Versturen", on_click=bevestig_worpen)
@@ -369,29 +287,20 @@ if st.session_state.pagina == 3:
 
     st.button("Terug naar startpagina", on_click=terug_naar_start)
     st.header("📊 Resultaten & Statistieken")
+    if st.session_state.get("verstuurd") is False:
+        st.info("Google Sheets is even niet bereikbaar; je worpen zijn lokaal bewaard en worden later verstuurd.")
 
-    rows = sheet.get_all_values()[1:]
-
-    # --- Totale worpen per sessie ---
-    sessie_totals = {}
-    for r in rows:
-        naam, ts, vak, aantal = r
-        aantal = int(aantal)
-        if naam not in sessie_totals:
-            sessie_totals[naam] = {}
-        if ts not in sessie_totals[naam]:
-            sessie_totals[naam][ts] = 0
-        sessie_totals[naam][ts] += aantal
+    stats = actuele_statistiek(forceer=st.session_state.pop("ververs", False))
 
     # --- Algemene ranking ---
-    min_scores = [[naam, min(sessies.values())] for naam, sessies in sessie_totals.items()]
-    df_totals = pd.DataFrame(min_scores, columns=["Naam", "Totaal worpen (minimaal)"])
-    df_totals = df_totals.sort_values("Totaal worpen (minimaal)").reset_index(drop=True)
-    df_totals.insert(0, "Positie", range(1, len(df_totals)+1))
-    st.dataframe(df_totals, use_container_width=True, hide_index=True)
+    genormaliseerd = st.toggle(
+        "Corrigeer voor moeilijkheid van de vakken", value=True, key="ranglijst_genormaliseerd_stats",
+        help="Je totaal gedeeld door het verwachte totaal voor jouw 20 vakken. 1,00 = gemiddeld, lager is beter."
+    )
+    st.dataframe(stats.ranglijst(genormaliseerd), use_container_width=True, hide_index=True)
 
     # --- Spelerselectie ---
-    alle_namen = sorted(list(set(r[0] for r in rows if r[0])))
+    alle_namen = stats.namen()
     if "gekozen_speler_stats" not in st.session_state:
         st.session_state.gekozen_speler_stats = st.session_state.naam if st.session_state.naam in alle_namen else alle_namen[0]
 
@@ -403,47 +312,9 @@ if st.session_state.pagina == 3:
     )
     gekozen_speler_stats = st.session_state.gekozen_speler_stats
 
-    # --- Beste per categorie (links) ---
-    categorie_data = {"Double": [], "Triple": [], "Single boven": [], "Single onder": [], "Outer Bull": [], "Bullseye": []}
-    for r in rows:
-        naam, ts, vak, aantal = r
-        aantal = int(aantal)
-        if naam != gekozen_speler_stats:
-            continue
-
-        vak_l = vak.lower()
-        if "double" in vak_l and "bull" not in vak_l:
-            categorie_data["Double"].append((vak, aantal))
-        elif "triple" in vak_l:
-            categorie_data["Triple"].append((vak, aantal))
-        elif "boven" in vak_l:
-            categorie_data["Single boven"].append((vak, aantal))
-        elif "onder" in vak_l:
-            categorie_data["Single onder"].append((vak, aantal))
-        elif "outer bull" in vak_l:
-            categorie_data["Outer Bull"].append((vak, aantal))
-        elif "bullseye" in vak_l:
-            categorie_data["Bullseye"].append((vak, aantal))
-
-    beste_rows = []
-    for cat, entries in categorie_data.items():
-        if entries:
-            beste = min(entries, key=lambda x: x[1])
-            beste_rows.append([cat, beste[0], beste[1]])
-        else:
-            beste_rows.append([cat, None, None])
-    df_beste = pd.DataFrame(beste_rows, columns=["Categorie", "Vak", "Aantal worpen"])
-
-    # --- Top 6 totaal aantal worpen per sessie (rechts) ---
-    speler_sessies = sessie_totals.get(gekozen_speler_stats, {})
-    if speler_sessies:
-        sorted_sessies = sorted(speler_sessies.items(), key=lambda x: x[1])[:6]
-        df_top6 = pd.DataFrame({
-            "Positie": range(1, len(sorted_sessies)+1),
-            "Totaal aantal worpen": [totaal for ts, totaal in sorted_sessies]
-        })
-    else:
-        df_top6 = pd.DataFrame({"Positie": [], "Totaal aantal worpen": []})
+    # --- Beste per categorie (links) en top 6 totaal aantal worpen per sessie (rechts) ---
+    df_beste = stats.beste_per_categorie(gekozen_speler_stats)
+    df_top6 = stats.top_sessies(gekozen_speler_stats, 6)
 
     # --- Toon tabellen naast elkaar ---
     colL, colR = st.columns([1,1])
@@ -455,16 +326,7 @@ if st.session_state.pagina == 3:
         st.dataframe(df_top6, use_container_width=True, hide_index=True)
 
     # --- Vakken overzicht onderaan ---
-    vak_data = {}
-    for r in rows:
-        naam, ts, vak, aantal = r
-        if naam != gekozen_speler_stats:
-            continue
-        aantal = int(aantal)
-        vak_data.setdefault(vak, []).append(aantal)
-
-    vak_rows = [[vak, min(aantallen), max(aantallen)] for vak, aantallen in vak_data.items()]
-    df_vakken = pd.DataFrame(vak_rows, columns=["Vak", "Beste worpen (min)", "Slechtste worpen (max)"]).sort_values("Vak")
+    df_vakken = stats.per_vak(gekozen_speler_stats)
 
     st.subheader("📌 Beste & slechtste worpen per vak")
     st.dataframe(df_vakken, use_container_width=True, hide_index=True)
@@ -1,7 +1,11 @@
 import streamlit as st
+import hashlib
+import json
+import os
+import numpy as np
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
+from gspread.utils import rowcol_to_a1
+import sheets
 
 # ----------------------
 # CONFIGURATIE
@@ -12,32 +16,14 @@ SPELERS_TAB = "spelers"
 INZET_TAB = "inzetten"
 AFLEVERING_TAB = "aflevering"
 
-SERVICE_ACCOUNT_INFO = st.secrets["gcp_service_account"]
-
-scope = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
-
-# ----------------------
-# GOOGLE SHEETS CONNECTIE
-# ----------------------
-creds = Credentials.from_service_account_info(
-    SERVICE_ACCOUNT_INFO, scopes=scope
-)
-client = gspread.authorize(creds)
-spreadsheet = client.open(SHEET_NAAM)
-
-kandidaten_sheet = spreadsheet.worksheet(KANDIDATEN_TAB)
-spelers_sheet = spreadsheet.worksheet(SPELERS_TAB)
-inzet_sheet = spreadsheet.worksheet(INZET_TAB)
-aflevering_sheet = spreadsheet.worksheet(AFLEVERING_TAB)
+# Lokaal journaal van verwerkte afleveringen (append-only, één regel per stap)
+JOURNAAL_PAD = os.path.join(".data", "demol_afrekeningen.jsonl")
 
 # ----------------------
 # DATA INLEZEN FUNCTIE
 # ----------------------
-def load_sheet(sheet, default_columns=None):
-    df = pd.DataFrame(sheet.get_all_records())
+def load_sheet(tabblad, default_columns=None):
+    df = pd.DataFrame(sheets.lees_records(SHEET_NAAM, tabblad))
     if df.empty and default_columns:
         df = pd.DataFrame(columns=default_columns)
     df.columns = df.columns.str.strip().str.lower()
@@ -46,13 +32,13 @@ def load_sheet(sheet, default_columns=None):
 # ----------------------
 # LAAD DATA
 # ----------------------
-kandidaten_df = load_sheet(kandidaten_sheet, default_columns=["naam", "actief"])
-spelers_df = load_sheet(spelers_sheet, default_columns=["naam", "punten"])
+kandidaten_df = load_sheet(KANDIDATEN_TAB, default_columns=["naam", "actief"])
+spelers_df = load_sheet(SPELERS_TAB, default_columns=["naam", "punten"])
 spelers_df["punten"] = spelers_df["punten"].astype(int)
 
-inzetten_df = load_sheet(inzet_sheet, default_columns=["speler", "kandidaat", "punten", "aflevering"])
+inzetten_df = load_sheet(INZET_TAB, default_columns=["speler", "kandidaat", "punten", "aflevering"])
 
-aflevering_df = load_sheet(aflevering_sheet, default_columns=["aflevering"])
+aflevering_df = load_sheet(AFLEVERING_TAB, default_columns=["aflevering"])
 AFLEVERING = int(aflevering_df.loc[0, "aflevering"]) if not aflevering_df.empty else 1
 
 # ----------------------
@@ -63,32 +49,151 @@ pagina = st.sidebar.selectbox("Pagina", ["Speler", "Beheer"])
 # ----------------------
 # FUNCTIE: AFLEVERING VERWERKEN
 # ----------------------
-def verwerk_aflevering(aflevering):
-    """Verwerk alle inzetten: verdubbel punten voor actieve kandidaten, verwijder punten voor uitgevallen kandidaten,
-       en verhoog aflevering in sheet."""
-    global spelers_df, inzetten_df, AFLEVERING
-
-    inzetten_aflr = inzetten_df[inzetten_df["aflevering"] == aflevering]
-    actieve_kandidaten = kandidaten_df[kandidaten_df["actief"].str.lower() == "ja"]["naam"].tolist()
-
-    for speler_naam in inzetten_aflr["speler"].unique():
-        speler_inzetten = inzetten_aflr[inzetten_aflr["speler"] == speler_naam]
+def afrekening(spelers_df, inzetten_df, kandidaten_df, aflevering):
+    """Nieuwe punten per speler (zelfde volgorde als spelers_df): twee keer de
+    inzet op kandidaten die nog actief zijn. Spelers zonder inzet in deze
+    aflevering houden hun punten. Eén merge + groupby over alle inzetten."""
+    inzetten = inzetten_df.loc[inzetten_df["aflevering"] == aflevering, ["speler", "kandidaat", "punten"]]
+    actief = kandidaten_df.loc[
+        kandidaten_df["actief"].astype(str).str.lower() == "ja", ["naam"]
+    ].drop_duplicates().rename(columns={"naam": "kandidaat"}).assign(actief=True)
+    inzetten = inzetten.merge(actief, on="kandidaat", how="left")
+    uitbetaling = inzetten["punten"].astype(int).where(inzetten["actief"].eq(True), 0) * 2
+    nieuw = uitbetaling.groupby(inzetten["speler"]).sum()
+    return spelers_df["naam"].map(nieuw).fillna(spelers_df["punten"]).astype(int)
+
+
+def gewijzigde_cellen(spelers_df, nieuwe_punten):
+    """Alleen de puntencellen die echt veranderen, als data voor batch_update_tabbladen
+    (rij 1 is de header)."""
+    kolom = spelers_df.columns.get_loc("punten") + 1
+    nieuw = nieuwe_punten.to_numpy()
+    gewijzigd = np.flatnonzero(nieuw != spelers_df["punten"].to_numpy())
+    return [{"range": rowcol_to_a1(i + 2, kolom), "values": [[int(nieuw[i])]]} for i in gewijzigd]
 
-        # Bereken nieuwe punten: alleen verdubbelde inzet op actieve kandidaten
-        totaal_voor_actieve = speler_inzetten[
-            speler_inzetten["kandidaat"].isin(actieve_kandidaten)
-        ]["punten"].sum()
-        nieuwe_punten = totaal_voor_actieve * 2
 
-        # Zet het puntenaantal van de speler op deze nieuwe waarde
-        spelers_df.loc[spelers_df["naam"] == speler_naam, "punten"] = nieuwe_punten
+# ----------------------
+# AFREKENJOURNAAL
+# ----------------------
+# Per afrekening eerst een regel 'berekend' (met de nieuwe stand), na de
+# schrijfactie een regel 'verstuurd'. Een regel hoort bij één toestand: de
+# sheet (id), de aflevering en een vingerafdruk van de spelersstand ervoor.
+# Een nieuw seizoen of een teruggezette sheet geeft dus een nieuwe afrekening,
+# en een onderbroken verwerking wordt met dezelfde uitkomst afgemaakt.
+def vingerafdruk(namen, punten):
+    """Korte hash van de stand (naam + punten, volgorde maakt niet uit)."""
+    stand = sorted(zip(map(str, namen), map(int, punten)))
+    return hashlib.sha1(json.dumps(stand).encode("utf-8")).hexdigest()[:16]
+
+
+def lees_journaal():
+    """Lijst van afrekeningen {"sheet", "aflevering", "voor", "na", "punten",
+    "verstuurd"} in de volgorde van het journaal."""
+    journaal = {}
+    try:
+        with open(JOURNAAL_PAD, encoding="utf-8") as f:
+            for regel in f:
+                try:
+                    stap = json.loads(regel)
+                except json.JSONDecodeError:
+                    continue  # half geschreven laatste regel
+                sleutel = (stap.get("sheet"), stap["aflevering"], stap.get("voor"))
+                if stap["stap"] == "berekend":
+                    journaal[sleutel] = dict(stap, verstuurd=False)
+                elif sleutel in journaal:
+                    journaal[sleutel]["verstuurd"] = True
+    except FileNotFoundError:
+        pass
+    return list(journaal.values())
+
+
+def schrijf_journaal(stap):
+    os.makedirs(os.path.dirname(JOURNAAL_PAD), exist_ok=True)
+    with open(JOURNAAL_PAD, "a", encoding="utf-8") as f:
+        f.write(json.dumps(stap) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def stand_per_aflevering(journaal, sheet_id):
+    """Punten per speler na elke verwerkte aflevering van deze sheet, alleen
+    uit het journaal (zonder de inzetten opnieuw te lezen). Is een aflevering
+    vaker afgerekend, dan telt de laatste."""
+    per_aflevering = {
+        stap["aflevering"]: stap["punten"]
+        for stap in journaal if stap["verstuurd"] and stap.get("sheet") == sheet_id
+    }
+    return pd.DataFrame({
+        aflevering: pd.Series(punten) for aflevering, punten in sorted(per_aflevering.items())
+    }).rename_axis("naam")
+
+
+def rond_onderbroken_af(sheet_id, aflevering):
+    """Is de sheet al bij `aflevering` maar staat de vorige nog alleen als
+    'berekend' in het journaal (gestopt na de schrijfactie, vóór 'verstuurd'),
+    en is de stand precies de berekende, dan alsnog als verstuurd noteren."""
+    vorige = [
+        stap for stap in lees_journaal()
+        if stap.get("sheet") == sheet_id and stap["aflevering"] == aflevering - 1
+    ]
+    if any(stap["verstuurd"] for stap in vorige):
+        return
+    huidig = vingerafdruk(spelers_df["naam"], spelers_df["punten"])
+    for stap in reversed(vorige):
+        if stap["na"] == huidig:
+            schrijf_journaal({"sheet": sheet_id, "aflevering": stap["aflevering"],
+                              "voor": stap["voor"], "stap": "verstuurd"})
+            return
 
-    # Update spelers sheet
-    spelers_sheet.update([spelers_df.columns.tolist()] + spelers_df.values.tolist())
 
-    # Verhoog AFLEVERING met 1 en update sheet
-    AFLEVERING += 1
-    aflevering_sheet.update([["aflevering"]] + [[AFLEVERING]])
+def verwerk_aflevering(aflevering):
+    """Verwerk alle inzetten: verdubbel punten voor actieve kandidaten, verwijder punten voor uitgevallen kandidaten,
+       en verhoog aflevering in sheet. Spelers en aflevering gaan in één schrijfactie."""
+    global spelers_df, AFLEVERING
+
+    sheet_id = sheets.get_spreadsheet(SHEET_NAAM).id
+    huidig = vingerafdruk(spelers_df["naam"], spelers_df["punten"])
+    afrekeningen = [
+        stap for stap in lees_journaal()
+        if stap.get("sheet") == sheet_id and stap["aflevering"] == aflevering
+    ]
+    if any(stap["na"] == huidig for stap in afrekeningen):
+        # De punten staan al in de sheet (alleen de aflevering niet): niet
+        # nog een keer afrekenen, alleen de aflevering ophogen
+        stap, cellen = None, []
+    else:
+        stap = next((s for s in afrekeningen if s["voor"] == huidig and not s["verstuurd"]), None)
+        if stap is None:
+            nieuwe_punten = afrekening(spelers_df, inzetten_df, kandidaten_df, aflevering)
+            stap = {
+                "sheet": sheet_id,
+                "aflevering": aflevering,
+                "stap": "berekend",
+                "voor": huidig,
+                "na": vingerafdruk(spelers_df["naam"], nieuwe_punten),
+                "punten": dict(zip(spelers_df["naam"].astype(str), nieuwe_punten.tolist())),
+            }
+            schrijf_journaal(stap)
+        # Cellen per spelersnaam uit de huidige sheet, niet uit het journaal
+        nieuwe_punten = spelers_df["naam"].astype(str).map(stap["punten"]).fillna(spelers_df["punten"]).astype(int)
+        cellen = gewijzigde_cellen(spelers_df, nieuwe_punten)
+
+    # Punten en de volgende aflevering in één aanroep: allebei of geen van beide
+    try:
+        sheets.batch_update_tabbladen(SHEET_NAAM, {
+            SPELERS_TAB: cellen,
+            AFLEVERING_TAB: [{"range": "A1", "values": [["aflevering"], [aflevering + 1]]}],
+        })
+    except Exception as e:
+        st.error(f"Opslaan mislukt ({e}). Klik nog een keer om aflevering {aflevering} af te ronden.")
+        return
+    AFLEVERING = aflevering + 1
+    if stap is None:
+        st.info(f"Punten van aflevering {aflevering} stonden al in de sheet; AFLEVERING is nu {AFLEVERING}")
+        return
+    schrijf_journaal({"sheet": sheet_id, "aflevering": aflevering, "voor": stap["voor"], "stap": "verstuurd"})
+
+    spelers_df["punten"] = nieuwe_punten
     st.success(f"Aflevering {aflevering} verwerkt! Nieuwe AFLEVERING is {AFLEVERING}")
 
 # ----------------------
@@ -166,7 +271,7 @@ if pagina == "Speler":
             return
         for k, p in inzet_data.items():
             if p > 0:
-                inzet_sheet.append_row([speler, k, int(p), AFLEVERING])
+                sheets.append_row(SHEET_NAAM, INZET_TAB, [speler, k, int(p), AFLEVERING])
         st.success("Je inzet is opgeslagen!")
 
     st.button("Opslaan", on_click=opslaan, disabled=(totaal != punten))
@@ -187,10 +292,20 @@ elif pagina == "Beheer":
     if st.button("Update kandidaten status"):
         for k in kandidaten_uit:
             kandidaten_df.loc[kandidaten_df["naam"] == k, "actief"] = "Nee"
-        kandidaten_sheet.update([kandidaten_df.columns.tolist()] + kandidaten_df.values.tolist())
+        sheets.update(SHEET_NAAM, KANDIDATEN_TAB, [kandidaten_df.columns.tolist()] + kandidaten_df.values.tolist())
         st.success("Kandidatenstatus bijgewerkt!")
 
     st.markdown("---")
     st.markdown(f"**Stap 2: Verwerk punten voor aflevering {AFLEVERING} en verhoog AFLEVERING**")
-    if st.button(f"Verwerk aflevering {AFLEVERING}"):
-        verwerk_aflevering(AFLEVERING)
\ No newline at end of file
+    sheet_id = sheets.get_spreadsheet(SHEET_NAAM).id
+    rond_onderbroken_af(sheet_id, AFLEVERING)
+
+    # Key per aflevering: een dubbele klik verwerkt niet ook de volgende
+    if st.button(f"Verwerk aflevering {AFLEVERING}", key=f"verwerk_{AFLEVERING}"):
+        verwerk_aflevering(AFLEVERING)
+
+    stand = stand_per_aflevering(lees_journaal(), sheet_id)
+    if not stand.empty:
+        st.markdown("---")
+        st.markdown("**Verloop van de punten per aflevering**")
+        st.dataframe(stand)
\ No newline at end of file
@@ -0,0 +1,298 @@
+import csv
+import io
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+import bedragen
+import categorisering
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+# Aantal transacties dat per keer genormaliseerd en opgeslagen wordt; bepaalt
+# (naast de dubbelindex) het geheugengebruik, niet de grootte van het bestand
+CHUNK_GROOTTE = 5000
+
+STANDAARD_CATEGORIE = categorisering.ONGECATEGORISEERD
+STANDAARD_SOORT = "Variabel"
+
+# Herkenning van CSV-exports van Nederlandse banken aan hun kolomnamen
+CSV_PROFIELEN = [
+    {
+        "bank": "ING",
+        "herkenning": {"Naam / Omschrijving", "Af Bij"},
+        "datum": "Datum",
+        "datum_formaat": "%Y%m%d",
+        "bedrag": "Bedrag (EUR)",
+        "af_bij": "Af Bij",
+        "tegenpartij": "Naam / Omschrijving",
+        "omschrijving": ["Mededelingen"],
+    },
+    {
+        "bank": "Rabobank",
+        "herkenning": {"Naam tegenpartij", "Omschrijving-1"},
+        "datum": "Datum",
+        "datum_formaat": "%Y-%m-%d",
+        "bedrag": "Bedrag",
+        "af_bij": None,
+        "tegenpartij": "Naam tegenpartij",
+        "omschrijving": ["Omschrijving-1", "Omschrijving-2", "Omschrijving-3"],
+    },
+    {
+        "bank": "Algemeen",
+        "herkenning": {"Datum", "Bedrag"},
+        "datum": "Datum",
+        "datum_formaat": None,
+        "bedrag": "Bedrag",
+        "af_bij": None,
+        "tegenpartij": "Omschrijving",
+        "omschrijving": [],
+    },
+]
+
+# ----------------------
+# PARSERS (generators, één transactie per keer)
+# ----------------------
+def _lees_csv(regels):
+    """CSV van ING, Rabobank, ABN AMRO (.TAB zonder header) of een eigen
+    bestand met minimaal de kolommen Datum en Bedrag."""
+    eerste = next(regels, "")
+    scheiding = max(";\t,", key=eerste.count)
+    kop = next(csv.reader([eerste], delimiter=scheiding))
+
+    # ABN AMRO: tab-gescheiden, geen header, datum (jjjjmmdd) in kolom 3
+    if scheiding == "\t" and len(kop) >= 8 and re.fullmatch(r"\d{8}", kop[2]):
+        def abn():
+            for rij in csv.reader(_met_eerste(eerste, regels), delimiter=scheiding):
+                if len(rij) >= 8:
+                    yield {"Datum": rij[2], "Bedrag": rij[6], "Tegenpartij": "",
+                           "Omschrijving": " ".join(rij[7].split())}
+        return "%Y%m%d", abn()
+
+    kop = [k.strip() for k in kop]
+    profiel = next((p for p in CSV_PROFIELEN if p["herkenning"] <= set(kop)), None)
+    if profiel is None:
+        raise ValueError(f"Onbekend CSV-formaat, kolommen: {', '.join(kop)}")
+
+    def rijen():
+        for rij in csv.DictReader(regels, fieldnames=kop, delimiter=scheiding):
+            bedrag = rij.get(profiel["bedrag"]) or ""
+            if profiel["af_bij"] and (rij.get(profiel["af_bij"]) or "").strip().lower() == "af":
+                bedrag = "-" + bedrag
+            omschrijving = " ".join(
+                (rij.get(k) or "").strip() for k in profiel["omschrijving"]
+            ).strip()
+            yield {
+                "Datum": rij.get(profiel["datum"]),
+                "Bedrag": bedrag,
+                "Tegenpartij": (rij.get(profiel["tegenpartij"]) or "").strip(),
+                "Omschrijving": omschrijving,
+            }
+    return profiel["datum_formaat"], rijen()
+
+
+_MT940_61 = re.compile(r"^(\d{6})(\d{4})?(RC|RD|C|D)[A-Z]?(\d+,\d{0,2})")
+_MT940_VELD_86 = re.compile(r"/(NAME|REMI)/([^/]*)")
+
+
+def _lees_mt940(regels):
+    """MT940: elke :61:-regel is een transactie, de :86:-regel(s) erna de
+    omschrijving (met /NAME/ en /REMI/ bij gestructureerde exports)."""
+    def transacties():
+        huidig, info = None, []
+        for regel in regels:
+            regel = regel.rstrip("\r\n")
+            if regel.startswith((":", "-")):
+                if huidig and info:
+                    huidig.update(_mt940_info(" ".join(info)))
+                    info = []
+                if regel.startswith(":61:"):
+                    if huidig:
+                        yield huidig
+                    match = _MT940_61.match(regel[4:])
+                    huidig = None
+                    if match:
+                        datum, _, teken, bedrag = match.groups()
+                        negatief = teken in ("D", "RC")
+                        huidig = {"Datum": datum, "Bedrag": ("-" if negatief else "") + bedrag,
+                                  "Tegenpartij": "", "Omschrijving": ""}
+                elif regel.startswith(":86:") and huidig:
+                    info = [regel[4:]]
+                elif huidig:
+                    # Einde van het transactieblok
+                    yield huidig
+                    huidig = None
+            elif info:
+                info.append(regel)
+        if huidig:
+            if info:
+                huidig.update(_mt940_info(" ".join(info)))
+            yield huidig
+    return "%y%m%d", transacties()
+
+
+def _mt940_info(tekst):
+    velden = dict(_MT940_VELD_86.findall(tekst))
+    if velden:
+        return {"Tegenpartij": velden.get("NAME", "").strip(),
+                "Omschrijving": velden.get("REMI", "").strip()}
+    return {"Omschrijving": " ".join(tekst.split())}
+
+
+def _lees_camt053(bestand):
+    """CAMT.053 (XML) via iterparse; verwerkte <Ntry>-elementen worden direct
+    weer vrijgegeven zodat het geheugengebruik niet meegroeit met het bestand."""
+    def tekst(element, pad):
+        gevonden = element.find(pad)
+        return gevonden.text.strip() if gevonden is not None and gevonden.text else ""
+
+    def transacties():
+        afschrift = None
+        for gebeurtenis, element in ET.iterparse(bestand, events=("start", "end")):
+            if gebeurtenis == "start":
+                if element.tag.endswith("}Stmt"):
+                    afschrift = element
+                continue
+            if not element.tag.endswith("}Ntry"):
+                continue
+            # Zoekpaden in dezelfde namespace als het element
+            ns = element.tag[:-len("Ntry")]
+            datum = tekst(element, f"{ns}BookgDt/{ns}Dt") or tekst(element, f"{ns}BookgDt/{ns}DtTm")[:10]
+            bedrag = tekst(element, f"{ns}Amt").replace(".", ",")
+            debet = tekst(element, f"{ns}CdtDbtInd") == "DBIT"
+            partij = f"{ns}Cdtr" if debet else f"{ns}Dbtr"
+            details = f"{ns}NtryDtls/{ns}TxDtls"
+            yield {
+                "Datum": datum,
+                "Bedrag": ("-" if debet else "") + bedrag,
+                "Tegenpartij": tekst(element, f"{details}/{ns}RltdPties/{partij}/{ns}Nm")
+                               or tekst(element, f"{details}/{ns}RltdPties/{partij}/{ns}Pty/{ns}Nm"),
+                "Omschrijving": " ".join(
+                    e.text.strip() for e in element.iter(f"{ns}Ustrd") if e.text
+                ) or tekst(element, f"{ns}AddtlNtryInf"),
+            }
+            element.clear()
+            if afschrift is not None:
+                afschrift.remove(element)
+    return "%Y-%m-%d", transacties()
+
+
+def _met_eerste(eerste, regels):
+    yield eerste
+    yield from regels
+
+# ----------------------
+# PIPELINE
+# ----------------------
+def detecteer_formaat(naam, begin):
+    begin = begin.lstrip()
+    if begin.startswith("<"):
+        return "camt053"
+    if begin.startswith(("{1:", ":20:", ":940:")) or naam.lower().endswith((".sta", ".940", ".mt940")):
+        return "mt940"
+    return "csv"
+
+
+def lees_ruw(bestand, naam=""):
+    """Open een bankbestand (binair, bv. een st.file_uploader-upload) en geef
+    (datum_formaat, generator van ruwe transacties) terug."""
+    begin = bestand.read(256).decode("utf-8-sig", errors="replace")
+    bestand.seek(0)
+    formaat = detecteer_formaat(naam, begin)
+    if formaat == "camt053":
+        return _lees_camt053(bestand)
+    regels = io.TextIOWrapper(bestand, encoding="utf-8-sig", errors="replace", newline="")
+    if formaat == "mt940":
+        return _lees_mt940(iter(regels))
+    return _lees_csv(iter(regels))
+
+
+def normaliseer(ruw, datum_formaat):
+    """Een chunk ruwe transacties naar de grootboekvorm (Bedrag in centen)."""
+    df = pd.DataFrame(ruw, columns=["Datum", "Bedrag", "Tegenpartij", "Omschrijving"])
+    datum = df["Datum"].fillna("").str.strip()
+    if datum_formaat:
+        df["Datum"] = pd.to_datetime(datum, format=datum_formaat, errors="coerce")
+    else:
+        df["Datum"] = pd.to_datetime(datum, dayfirst=True, errors="coerce")
+    df["Bedrag"] = bedragen.naar_centen(df["Bedrag"].fillna(""), in_centen=False)
+    # Als omschrijving in het grootboek nemen we de tegenpartij (zoals "AH"),
+    # bij gebrek daaraan de omschrijving van de bank
+    tegenpartij = df["Tegenpartij"].fillna("").str.strip()
+    df["Omschrijving"] = tegenpartij.where(tegenpartij != "", df["Omschrijving"].fillna("").str.strip())
+    return df.loc[df["Datum"].notna(), ["Datum", "Bedrag", "Omschrijving"]]
+
+
+def lees_transacties(bestand, naam="", chunk_grootte=CHUNK_GROOTTE):
+    """Generator van genormaliseerde DataFrames van maximaal chunk_grootte rijen."""
+    datum_formaat, ruw = lees_ruw(bestand, naam)
+    while True:
+        chunk = list(islice(ruw, chunk_grootte))
+        if not chunk:
+            return
+        yield normaliseer(chunk, datum_formaat)
+
+# ----------------------
+# DUBBELE TRANSACTIES
+# ----------------------
+def _sleutels(df):
+    """Hash per transactie op (datum, bedrag, omschrijving)."""
+    sleutel = pd.DataFrame({
+        "Datum": pd.to_datetime(df["Datum"]).dt.normalize(),
+        "Bedrag": df["Bedrag"].astype("int64"),
+        "Omschrijving": df["Omschrijving"].fillna("").astype(str).str.strip().str.lower(),
+    })
+    return pd.util.hash_pandas_object(sleutel, index=False).to_numpy()
+
+
+def dubbel_index(grootboek_df):
+    """Telling per transactiesleutel in het bestaande grootboek. Een telling
+    (geen set), zodat twee echte identieke transacties op één dag blijven
+    kloppen."""
+    if grootboek_df.empty:
+        return Counter()
+    return Counter(_sleutels(grootboek_df).tolist())
+
+
+def filter_nieuw(df, index):
+    """Laat alleen transacties door die nog niet in de index staan en werk de
+    index direct bij."""
+    nieuw = np.ones(len(df), dtype=bool)
+    for i, sleutel in enumerate(_sleutels(df).tolist()):
+        if index[sleutel] > 0:
+            index[sleutel] -= 1
+            nieuw[i] = False
+    return df[nieuw]
+
+# ----------------------
+# IMPORTEREN
+# ----------------------
+def importeer(boek, bestand, naam="", categorie=STANDAARD_CATEGORIE, soort=STANDAARD_SOORT):
+    """Importeer een bankbestand in het grootboek. Geeft (nieuw, dubbel,
+    onleesbaar) terug; transacties met een onleesbaar bedrag worden overgeslagen.
+
+    De categorie komt uit de regels die uit het grootboek geleerd zijn;
+    `categorie` is alleen voor transacties waar geen regel op past."""
+    index = dubbel_index(boek.lees())
+    categorisator = boek.categorisator()
+    aantal_nieuw = aantal_dubbel = aantal_onleesbaar = 0
+    for chunk in lees_transacties(bestand, naam):
+        leesbaar = chunk["Bedrag"].notna()
+        aantal_onleesbaar += int((~leesbaar).sum())
+        chunk = chunk[leesbaar].astype({"Bedrag": "int64"})
+        nieuw = filter_nieuw(chunk, index)
+        aantal_dubbel += len(chunk) - len(nieuw)
+        if nieuw.empty:
+            continue
+        nieuw = nieuw.assign(
+            Categorie=categorisator.categoriseer(nieuw["Omschrijving"]).fillna(categorie),
+            Soort=soort
+        )
+        boek.voeg_toe(nieuw.to_dict("records"))
+        aantal_nieuw += len(nieuw)
+    return aantal_nieuw, aantal_dubbel, aantal_onleesbaar
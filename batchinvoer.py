@@ -0,0 +1,98 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+import bedragen
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+KOLOMMEN = ["Datum", "Categorie", "Omschrijving", "Bedrag", "Transactietype", "Soort"]
+TRANSACTIETYPES = ["Uitgave", "Inkomsten"]
+SOORTEN = ["Vaste last", "Variabel"]
+
+# ----------------------
+# INLEZEN
+# ----------------------
+def lege_batch():
+    df = pd.DataFrame(columns=KOLOMMEN)
+    df["Datum"] = pd.Series(dtype="object")
+    df["Bedrag"] = pd.Series(dtype="float")
+    return df
+
+
+def lees_tekst(tekst, categorisator=None):
+    """Lees geplakte regels of een CSV-bestand (scheidingsteken wordt zelf
+    herkend) naar een batch. Bedragen in Europese notatie; een minteken
+    betekent een uitgave als er geen Transactietype-kolom is. Met een
+    categorisator worden lege categorieën alvast ingevuld."""
+    if not tekst or not tekst.strip():
+        return lege_batch()
+    df = pd.read_csv(io.StringIO(tekst), sep=None, engine="python", dtype=str)
+    df.columns = [str(c).strip().capitalize() for c in df.columns]
+    df = df.rename(columns={"Type": "Transactietype", "Transactie": "Transactietype"})
+
+    centen = bedragen.naar_centen(df.get("Bedrag", pd.Series("", index=df.index)), in_centen=False)
+    if "Transactietype" not in df.columns:
+        df["Transactietype"] = np.where((centen < 0).fillna(False), "Uitgave", "Inkomsten")
+    # Onleesbare bedragen blijven leeg; valideer() meldt ze
+    df["Bedrag"] = (centen.abs() / 100).astype(float)
+    df["Datum"] = pd.to_datetime(df.get("Datum"), dayfirst=True, errors="coerce").dt.date
+    for col in ["Categorie", "Omschrijving", "Soort"]:
+        if col not in df.columns:
+            df[col] = ""
+    if categorisator is not None:
+        leeg = df["Categorie"].fillna("").str.strip() == ""
+        df.loc[leeg, "Categorie"] = categorisator.categoriseer(df.loc[leeg, "Omschrijving"]).fillna("")
+    return df[KOLOMMEN]
+
+# ----------------------
+# VALIDEREN
+# ----------------------
+def valideer(batch):
+    """Controleer een hele batch in één keer.
+
+    Geeft (rijen, fouten) terug: rijen zijn klaar voor Grootboek.voeg_toe
+    (Bedrag in centen, met het gebruikelijke teken), fouten is een tabel met
+    rijnummer en melding.
+    """
+    batch = batch.reindex(columns=KOLOMMEN)
+    # Helemaal lege regels (bv. de laatste regel van de editor) overslaan
+    batch = batch[batch.replace("", np.nan).notna().any(axis=1)]
+
+    datum = pd.to_datetime(batch["Datum"], dayfirst=True, errors="coerce")
+    categorie = batch["Categorie"].fillna("").astype(str).str.strip()
+    omschrijving = batch["Omschrijving"].fillna("").astype(str).str.strip()
+    transactietype = batch["Transactietype"].fillna("Uitgave")
+    soort = batch["Soort"].replace("", np.nan).fillna("Variabel")
+    centen = bedragen.naar_centen(batch["Bedrag"], in_centen=False)
+
+    controles = {
+        "Ongeldige datum": datum.isna(),
+        "Categorie ontbreekt": categorie == "",
+        # Op de ruwe invoer, niet op een omgezette 0: één lege of onleesbare
+        # cel mag geen transactie van €0 opleveren
+        "Bedrag ontbreekt of is ongeldig": centen.isna(),
+        "Onbekend transactietype": ~transactietype.isin(TRANSACTIETYPES),
+        "Onbekende soort": ~soort.isin(SOORTEN),
+    }
+    fouten = pd.concat(
+        [
+            pd.DataFrame({"Rij": batch.index[masker] + 1, "Fout": melding})
+            for melding, masker in controles.items()
+        ],
+        ignore_index=True
+    ).sort_values("Rij", kind="stable")
+    if not fouten.empty:
+        return [], fouten
+
+    rijen = pd.DataFrame({
+        "Datum": datum,
+        "Categorie": categorie,
+        "Bedrag": bedragen.met_teken(centen.to_numpy(dtype="int64"), transactietype.to_numpy()),
+        "Omschrijving": omschrijving,
+        "Soort": soort,
+    })
+    rijen["Bedrag"] = rijen["Bedrag"].astype(int)
+    return rijen.to_dict("records"), fouten
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_numeric_dtype
+
+# ----------------------
+# PARSEN: hele kolom in één keer naar centen
+# ----------------------
+# Europese notatie: optioneel teken en euroteken, duizendtallen met punten en
+# hoogstens twee centcijfers na één komma (een minteken achteraan mag ook)
+_BEDRAG = r"[-+]?\s*(?:€|eur)?\s*[-+]?\s*(?:\d+|\d{1,3}(?:\.\d{3})+)?(?:,\d{0,2})?\s*-?"
+
+
+def _getallen_naar_centen(getallen, in_centen):
+    getallen = getallen.astype(float)
+    if not in_centen:
+        getallen = getallen * 100
+    return getallen.round().astype("Int64")
+
+
+def naar_centen(waarden, in_centen=True):
+    """Zet een kolom bedragen om naar centen (Int64).
+
+    - Tekst met komma is Europese notatie in euro's ("1.234,56", "-12,5").
+    - Getallen en tekst zonder komma zijn centen als `in_centen` waar is,
+      anders euro's. Punten in tekst zijn duizendtallen.
+    - Lege of onleesbare waarden (letters, meer dan één komma, meer dan twee
+      centcijfers) worden NA; de aanroeper bepaalt hoe die gemeld worden.
+    """
+    s = pd.Series(waarden, copy=False)
+    if is_numeric_dtype(s):
+        return _getallen_naar_centen(s, in_centen)
+    if infer_dtype(s, skipna=True) not in ("string", "mixed", "mixed-integer"):
+        # Geen tekst in de kolom: alleen getallen en/of lege waarden
+        return _getallen_naar_centen(pd.to_numeric(s, errors="coerce"), in_centen)
+
+    s = s.astype(object)
+    # .str geeft NaN voor alles wat geen tekst is, dus echte getallen vallen eruit
+    tekst = s.str.strip()
+    is_tekst = tekst.notna()
+    centen = _getallen_naar_centen(pd.to_numeric(s.where(~is_tekst), errors="coerce"), in_centen)
+
+    geldig = (tekst.str.fullmatch(_BEDRAG, case=False, na=False)
+              & tekst.str.contains(r"\d", regex=True, na=False))
+    tekst = tekst.where(geldig, "")
+    negatief = tekst.str.contains("-", regex=False, na=False)
+    met_komma = tekst.str.contains(",", regex=False, na=False)
+    cijfers = tekst.str.replace(r"[^\d,]", "", regex=True)
+
+    # Euro's met komma: gehele euro's en centcijfers apart uitlezen, zodat er
+    # geen float-afronding in het spel is
+    delen = cijfers.where(met_komma, "").str.split(",", n=1, expand=True).reindex(columns=[0, 1])
+    euro = pd.to_numeric(delen[0], errors="coerce").fillna(0)
+    cent = pd.to_numeric(delen[1].fillna("").str.ljust(2, "0"), errors="coerce").fillna(0)
+    komma_centen = (euro * 100 + cent).astype("int64")
+
+    # Zonder komma: alleen cijfers
+    zonder_komma = pd.to_numeric(cijfers.where(geldig & ~met_komma), errors="coerce")
+    zonder_komma_centen = _getallen_naar_centen(zonder_komma, in_centen)
+
+    tekst_centen = zonder_komma_centen.where(~met_komma, komma_centen)
+    tekst_centen = tekst_centen.where(~negatief, -tekst_centen)
+    centen = centen.where(~is_tekst, tekst_centen)
+    return centen.mask(is_tekst & ~geldig, pd.NA)
+
+# ----------------------
+# WEERGAVE
+# ----------------------
+def centen_naar_tekst(centen):
+    """Centen als tekst met komma als decimaalteken, bv. -125050 -> '-1250,50'."""
+    centen = pd.Series(centen, copy=False).astype("int64")
+    absoluut = centen.abs()
+    teken = pd.Series(np.where(centen < 0, "-", ""), index=centen.index)
+    return (
+        teken
+        + (absoluut // 100).astype(str)
+        + ","
+        + (absoluut % 100).astype(str).str.zfill(2)
+    )
+
+
+def met_teken(centen, transactietype):
+    """Uitgaven negatief, inkomsten positief (werkt op losse waarden en kolommen)."""
+    absoluut = np.abs(centen)
+    return np.where(np.asarray(transactietype) == "Uitgave", -absoluut, absoluut)
+
+
+def euro_naar_centen(bedrag):
+    """Eén bedrag in euro's (bv. uit st.number_input) naar hele centen."""
+    return int(round(float(bedrag) * 100))
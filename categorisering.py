@@ -0,0 +1,119 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+# Categorie voor transacties die (nog) niet ingedeeld zijn; daar leren we niet van
+ONGECATEGORISEERD = "Ongecategoriseerd"
+
+# Kortere sleutels matchen te makkelijk in willekeurige banktekst
+MIN_LENGTE = 2
+MAX_LENGTE = 100
+
+# ----------------------
+# NORMALISEREN
+# ----------------------
+# Woorden met cijfers (pasnummers, filiaalnummers, datums) en leestekens
+_RUIS = r"\S*\d\S*|[^0-9a-zà-ÿ]+"
+
+
+def normaliseer(omschrijvingen):
+    """Kleine letters, geen leestekens en geen woorden met cijfers, zodat
+    'ALBERT HEIJN 1234 A'DAM' en 'Albert Heijn' op elkaar lijken.
+
+    De tekstbewerkingen lopen via Arrow (komt met Streamlit mee) in plaats van
+    per waarde in Python."""
+    tekst = pd.Series(omschrijvingen, copy=False).fillna("").astype(str)
+    tekst = tekst.astype("string[pyarrow]").str.lower()
+    tekst = tekst.str.replace(_RUIS, " ", regex=True)
+    tekst = tekst.str.replace(r"\s+", " ", regex=True).str.strip()
+    return tekst.astype(object)
+
+# ----------------------
+# TRIE -> REGEX
+# ----------------------
+def _trie_patroon(woorden):
+    """Eén regex voor alle sleutels, opgebouwd als trie: gedeelde beginstukken
+    staan er één keer in, dus de regex-engine hoeft niet elke sleutel apart te
+    proberen. Vanaf één beginpositie gaat de langste sleutel voor."""
+    trie = {}
+    for woord in woorden:
+        knoop = trie
+        for teken in woord:
+            knoop = knoop.setdefault(teken, {})
+        knoop[""] = {}
+    return _knoop_patroon(trie)
+
+
+def _knoop_patroon(knoop):
+    einde = "" in knoop
+    takken = [re.escape(teken) + _knoop_patroon(kind)
+              for teken, kind in sorted(knoop.items()) if teken]
+    if not takken:
+        return ""
+    if len(takken) == 1 and not einde:
+        return takken[0]
+    groep = "(?:" + "|".join(takken) + ")"
+    return groep + "?" if einde else groep
+
+# ----------------------
+# CATEGORISATOR
+# ----------------------
+class Categorisator:
+    """Regels omschrijving -> categorie, geleerd uit het grootboek.
+
+    Per (genormaliseerde) omschrijving wint de categorie die er het vaakst bij
+    gebruikt is. Een nieuwe tekst krijgt eerst de categorie van een exact
+    gelijke omschrijving, anders die van de langste bekende omschrijving die
+    er als losse woorden in voorkomt.
+    """
+
+    def __init__(self, df, versie=None):
+        self.versie = versie
+        paren = pd.DataFrame({
+            "Sleutel": normaliseer(df["Omschrijving"]),
+            "Categorie": df["Categorie"].fillna("").astype(str).str.strip(),
+        })
+        lengte = paren["Sleutel"].str.len()
+        paren = paren[
+            (paren["Categorie"] != "") & (paren["Categorie"] != ONGECATEGORISEERD)
+            & (lengte >= MIN_LENGTE) & (lengte <= MAX_LENGTE)
+        ]
+        telling = paren.value_counts(["Sleutel", "Categorie"]).reset_index(name="Aantal")
+        # Meest gebruikte categorie per sleutel; bij gelijkspel alfabetisch
+        telling = telling.sort_values(["Sleutel", "Aantal", "Categorie"],
+                                      ascending=[True, False, True])
+        winnaar = telling.drop_duplicates("Sleutel")
+        self.regels = dict(zip(winnaar["Sleutel"], winnaar["Categorie"]))
+        self.patroon = None
+        if self.regels:
+            # Lookahead: vanaf elk woordbegin de langste sleutel, ook als
+            # kandidaten elkaar overlappen (findall geeft ze allemaal)
+            self.patroon = re.compile(rf"\b(?=({_trie_patroon(self.regels)})\b)")
+
+    def __len__(self):
+        return len(self.regels)
+
+    def categoriseer(self, omschrijvingen):
+        """Voorgestelde categorie per omschrijving (NaN als er geen regel past)."""
+        omschrijvingen = pd.Series(omschrijvingen, copy=False, dtype=object)
+        # Banktransacties herhalen zich veel: elke unieke tekst maar één keer
+        codes, uniek = pd.factorize(omschrijvingen.fillna(""))
+        uniek = normaliseer(pd.Series(uniek, dtype=object))
+        voorstel = uniek.map(self.regels)
+        if self.patroon is not None:
+            zoeken = voorstel.isna() & (uniek != "")
+            kandidaten = uniek[zoeken].str.findall(self.patroon)
+            # Langste sleutel wint; bij gelijke lengte de eerste in de tekst
+            langste = kandidaten.map(lambda gevonden: max(gevonden, key=len) if gevonden else None)
+            voorstel[zoeken] = langste.map(self.regels)
+        resultaat = voorstel.to_numpy()[codes] if len(uniek) else np.array([], dtype=object)
+        return pd.Series(resultaat, index=omschrijvingen.index, dtype=object)
+
+    def suggestie(self, omschrijving):
+        """Voorgestelde categorie voor één omschrijving, of None."""
+        voorstel = self.categoriseer([omschrijving]).iloc[0]
+        return None if pd.isna(voorstel) else voorstel
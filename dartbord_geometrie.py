@@ -0,0 +1,172 @@
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+
+# ----------------------
+# Dartbord instellingen
+# ----------------------
+ring_radii = {
+    "Double": (9.5, 10),          # dunne buitenring
+    "Single boven": (6, 9.5),     # grote strook boven triple
+    "Triple": (5.5, 6),           # dunne binnenring
+    "Single onder": (1.25, 5.5),  # grote strook onder triple
+    "Outer Bull": (1.5, 1.25),    # dunne single bull
+    "Bullseye": (0, 0.6)          # bull
+}
+
+dartbord_volgorde = [20,1,18,4,13,6,10,15,2,17,3,19,7,16,8,11,14,9,12,5]
+
+# Ringen per sector, van buiten naar binnen
+RINGEN = ["Double", "Single boven", "Triple", "Single onder"]
+
+# kleurenpatroon per sector
+kleuren_pattern = [
+    [(1,0,0), (0,0,0), (1,0,0), (0,0,0)],       # rood-zwart
+    [(0,0.5,0), (0.96,0.96,0.86), (0,0.5,0), (0.96,0.96,0.86)]  # groen-beige
+]
+BULL_KLEUREN = {"Outer Bull": (0,1,0), "Bullseye": (1,0,0)}
+
+ACCENT_KLEUR = (0,0,1)   # blauw
+ACCENT_RAND = 'gold'
+
+SECTOR_BREEDTE = 2*np.pi / 20
+# Fractie van de sector die gevuld wordt (de rest is de witte naad)
+SECTOR_VULLING = 0.95
+
+
+def vaknaam(ring, nummer):
+    if ring.startswith("Single"):
+        return f"Single {nummer} {ring.split()[1]}"
+    return f"{ring} {nummer}"
+
+
+# Alle 82 vakken in tekenvolgorde: per sector (klokrichting vanaf 20) de vier
+# ringen, daarna de bulls (Bullseye als laatste, boven op de Outer Bull)
+VAKKEN = [vaknaam(ring, nummer) for nummer in dartbord_volgorde for ring in RINGEN] + ["Outer Bull", "Bullseye"]
+VAK_INDEX = {vak: i for i, vak in enumerate(VAKKEN)}
+
+
+def get_type(vak):
+    vak_lower = vak.lower()
+    if vak_lower.startswith("single") and "onder" in vak_lower:
+        return "Single onder"
+    elif vak_lower.startswith("single") and "boven" in vak_lower:
+        return "Single boven"
+    elif vak_lower.startswith("double"):
+        return "Double"
+    elif vak_lower.startswith("triple"):
+        return "Triple"
+    elif "outer bull" in vak_lower:
+        return "Outer Bull"
+    elif "bullseye" in vak_lower:
+        return "Bullseye"
+    else:
+        raise ValueError(f"Onbekend vak: {vak}")
+
+# ----------------------
+# Geometrie (alle vakken in één keer)
+# ----------------------
+@lru_cache(maxsize=None)
+def vak_polygonen(punten=24):
+    """Hoekpunten van alle vakken als één array (82, 2*punten, 2), in de
+    volgorde van VAKKEN. Sector 0 (de 20) staat bovenaan, klokrichting."""
+    # Sectoren: buitenboog heen, binnenboog terug
+    midden = np.arange(20) * SECTOR_BREEDTE
+    halve = SECTOR_BREEDTE * SECTOR_VULLING / 2
+    t = np.linspace(-1, 1, punten)
+    theta = midden[:, None] + halve * t[None, :]                     # (20, punten)
+    theta = np.concatenate([theta, theta[:, ::-1]], axis=1)           # (20, 2*punten)
+
+    binnen = np.array([ring_radii[ring][0] for ring in RINGEN])
+    buiten = np.array([ring_radii[ring][1] for ring in RINGEN])
+    straal = np.concatenate([
+        np.repeat(buiten[:, None], punten, axis=1),
+        np.repeat(binnen[:, None], punten, axis=1),
+    ], axis=1)                                                        # (4, 2*punten)
+
+    hoek = np.pi/2 - theta[:, None, :]                                # (20, 1, 2*punten)
+    sectoren = np.stack([straal * np.cos(hoek), straal * np.sin(hoek)], axis=-1)
+    sectoren = sectoren.reshape(80, 2*punten, 2)
+
+    # Bulls als volle schijven met hetzelfde aantal hoekpunten
+    cirkel = np.linspace(0, 2*np.pi, 2*punten, endpoint=False)
+    bulls = np.stack([
+        ring_radii[vak][1] * np.stack([np.cos(cirkel), np.sin(cirkel)], axis=-1)
+        for vak in ("Outer Bull", "Bullseye")
+    ])
+    return np.concatenate([sectoren, bulls])
+
+
+def standaard_kleuren():
+    """RGBA per vak (82, 4) in de klassieke kleuren."""
+    sector = np.array([kleuren_pattern[i % 2] for i in range(20)]).reshape(80, 3)
+    bulls = np.array([BULL_KLEUREN["Outer Bull"], BULL_KLEUREN["Bullseye"]])
+    return to_rgba_array(np.concatenate([sector, bulls]))
+
+
+def kleuren_per_vak(kleur_van_vak):
+    """RGBA per vak uit een functie vak -> kleur (bv. op moeilijkheid)."""
+    return to_rgba_array([kleur_van_vak(vak) for vak in VAKKEN])
+
+# ----------------------
+# Tekenen
+# ----------------------
+def nieuw_figuur(figsize=(8,8)):
+    """Figure zonder pyplot: wordt niet in de globale figurenlijst bewaard,
+    dus hoeft niet gesloten te worden en lekt geen geheugen."""
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    return fig, ax
+
+
+def teken_bord(ax, kleuren=None, fontsize=14, lijndikte=0.5):
+    """Teken het hele bord als één PolyCollection plus de nummering.
+    Geeft de collectie terug; kleuren later aanpassen kan met set_facecolor."""
+    collectie = PolyCollection(
+        vak_polygonen(),
+        facecolors=standaard_kleuren() if kleuren is None else kleuren,
+        edgecolors='black',
+        linewidths=lijndikte,
+    )
+    ax.add_collection(collectie)
+
+    # Nummering rondom bord
+    hoek = np.pi/2 - np.arange(20) * SECTOR_BREEDTE
+    for nummer, x, y in zip(dartbord_volgorde, 10.7 * np.cos(hoek), 10.7 * np.sin(hoek)):
+        ax.text(x, y, str(nummer), ha='center', va='center', fontsize=fontsize, fontweight='bold')
+
+    ax.set_xlim(-11.5, 11.5)
+    ax.set_ylim(-11.5, 11.5)
+    ax.set_aspect('equal')
+    ax.set_axis_off()
+    return collectie
+
+
+def accent_rand(ax, vak):
+    """Gouden rand om één vak, als los (bovenliggend) patch; remove() om weg
+    te halen."""
+    rand = Polygon(vak_polygonen()[VAK_INDEX[vak]], closed=True, fill=False,
+                   edgecolor=ACCENT_RAND, linewidth=2, zorder=3)
+    ax.add_patch(rand)
+    return rand
+
+
+def teken_dartbord(focus_vak=None, titel=None, fontsize=14, ax=None):
+    """Bord met accent (blauw + goud) op focus_vak, op `ax` of anders in een
+    nieuw figuur. Geeft het figuur terug."""
+    if ax is None:
+        fig, ax = nieuw_figuur()
+    else:
+        fig = ax.figure
+    kleuren = standaard_kleuren()
+    if focus_vak in VAK_INDEX:
+        kleuren[VAK_INDEX[focus_vak]] = to_rgba_array([ACCENT_KLEUR])[0]
+    teken_bord(ax, kleuren, fontsize=fontsize)
+    if focus_vak in VAK_INDEX:
+        accent_rand(ax, focus_vak)
+    ax.set_title(titel if titel is not None else (focus_vak or ""), pad=20, fontsize=18, fontweight='bold')
+    return fig
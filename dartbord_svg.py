@@ -0,0 +1,168 @@
+import json
+import os
+
+import numpy as np
+from matplotlib.colors import to_hex
+
+import dartbord_geometrie as geo
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+# Map met de statische frontend (index.html) van het Streamlit-component
+FRONTEND_MAP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dartbord_frontend")
+
+# ----------------------
+# SVG (uit dezelfde geometrie als de matplotlib-versie)
+# ----------------------
+def _punt(straal, hoek):
+    # SVG heeft de y-as naar beneden
+    return f"{straal * np.cos(hoek):.3f},{-straal * np.sin(hoek):.3f}"
+
+
+def svg_bord():
+    """Het hele bord als SVG, elk vak een element met id 'vak-<index in
+    VAKKEN>' en zijn eigen kleur in data-kleur. Sectoren zijn bogen
+    (A-commando's), dus het bestand blijft klein."""
+    kleuren = [to_hex(kleur) for kleur in geo.standaard_kleuren()]
+    halve = geo.SECTOR_BREEDTE * geo.SECTOR_VULLING / 2
+    elementen = []
+    for i, nummer in enumerate(geo.dartbord_volgorde):
+        # Zelfde oriëntatie als de polaire plot: sector 0 bovenaan, klokrichting
+        begin = np.pi/2 - (i * geo.SECTOR_BREEDTE - halve)
+        einde = np.pi/2 - (i * geo.SECTOR_BREEDTE + halve)
+        for ring in geo.RINGEN:
+            index = geo.VAK_INDEX[geo.vaknaam(ring, nummer)]
+            binnen, buiten = geo.ring_radii[ring]
+            pad = (
+                f"M{_punt(buiten, begin)} A{buiten},{buiten} 0 0 1 {_punt(buiten, einde)} "
+                f"L{_punt(binnen, einde)} A{binnen},{binnen} 0 0 0 {_punt(binnen, begin)} Z"
+            )
+            elementen.append(
+                f'<path id="vak-{index}" d="{pad}" fill="{kleuren[index]}" data-kleur="{kleuren[index]}"/>'
+            )
+    for vak in ("Outer Bull", "Bullseye"):
+        index = geo.VAK_INDEX[vak]
+        elementen.append(
+            f'<circle id="vak-{index}" r="{geo.ring_radii[vak][1]}" fill="{kleuren[index]}" '
+            f'data-kleur="{kleuren[index]}"/>'
+        )
+
+    nummers = []
+    for i, nummer in enumerate(geo.dartbord_volgorde):
+        x, y = _punt(10.7, np.pi/2 - i * geo.SECTOR_BREEDTE).split(",")
+        nummers.append(f'<text x="{x}" y="{y}">{nummer}</text>')
+
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="-11.5 -11.5 23 23">'
+        '<g stroke="black" stroke-width="0.04">' + "".join(elementen) + "</g>"
+        # Gouden rand van het focusvak komt hier, boven alle vakken (zie markeer)
+        '<g id="rand" fill="none" stroke-width="0.16"></g>'
+        '<g class="nummers">' + "".join(nummers) + "</g>"
+        "</svg>"
+    )
+
+# ----------------------
+# STREAMLIT-COMPONENT (statische index.html)
+# ----------------------
+# Het bord staat in de HTML en wordt door de browser één keer geladen; bij een
+# volgend vak stuurt de server alleen nog het vaknummer mee (args.vak).
+_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+  body {{ margin: 0; font-family: "Source Sans Pro", sans-serif; text-align: center; }}
+  h2 {{ margin: 0 0 0.5rem 0; font-size: 1.6rem; }}
+  svg {{ width: 100%; max-width: 600px; }}
+  .nummers text {{ font-size: 1.1px; font-weight: bold; text-anchor: middle; dominant-baseline: central; }}
+</style>
+</head>
+<body>
+<h2 id="titel"></h2>
+{svg}
+<script>
+  var VAKKEN = {vakken};
+  var ACCENT_KLEUR = "{accent_kleur}";
+  var ACCENT_RAND = "{accent_rand}";
+
+  function stuur(type, gegevens) {{
+    var bericht = Object.assign({{isStreamlitMessage: true, type: type}}, gegevens || {{}});
+    window.parent.postMessage(bericht, "*");
+  }}
+
+  var vorige = null;
+
+  function markeer(index) {{
+    // Vorig focusvak terug naar zijn eigen kleur
+    if (vorige !== null) {{
+      vorige.setAttribute("fill", vorige.getAttribute("data-kleur"));
+      vorige = null;
+    }}
+    var rand = document.getElementById("rand");
+    while (rand.firstChild) {{
+      rand.removeChild(rand.firstChild);
+    }}
+    var geldig = index !== null && index !== undefined && index >= 0 && index < VAKKEN.length;
+    document.getElementById("titel").textContent = geldig ? VAKKEN[index] : "";
+    if (!geldig) {{
+      return;
+    }}
+    // Vulling op het vak zelf; de rand als losse kopie bovenop, net als
+    // accent_rand() in de matplotlib-versie
+    var vak = document.getElementById("vak-" + index);
+    vak.setAttribute("fill", ACCENT_KLEUR);
+    var kopie = vak.cloneNode(false);
+    kopie.removeAttribute("id");
+    kopie.setAttribute("fill", "none");
+    kopie.setAttribute("stroke", ACCENT_RAND);
+    rand.appendChild(kopie);
+    vorige = vak;
+  }}
+
+  window.addEventListener("message", function (event) {{
+    if (!event.data || event.data.type !== "streamlit:render") {{
+      return;
+    }}
+    markeer(event.data.args.vak);
+    stuur("streamlit:setFrameHeight", {{height: document.body.scrollHeight}});
+  }});
+
+  window.addEventListener("resize", function () {{
+    stuur("streamlit:setFrameHeight", {{height: document.body.scrollHeight}});
+  }});
+
+  stuur("streamlit:componentReady", {{apiVersion: 1}});
+</script>
+</body>
+</html>
+"""
+
+
+def index_html():
+    return _HTML.format(
+        svg=svg_bord(), vakken=json.dumps(geo.VAKKEN),
+        accent_kleur=to_hex(geo.ACCENT_KLEUR), accent_rand=to_hex(geo.ACCENT_RAND),
+    )
+
+
+def schrijf_frontend(map_naam=FRONTEND_MAP):
+    """Schrijf index.html (alleen als de inhoud veranderd is) en geef de map
+    terug voor components.declare_component. Het bestand wordt altijd hier
+    gegenereerd en staat niet in git."""
+    os.makedirs(map_naam, exist_ok=True)
+    pad = os.path.join(map_naam, "index.html")
+    inhoud = index_html()
+    try:
+        with open(pad, encoding="utf-8") as f:
+            if f.read() == inhoud:
+                return map_naam
+    except FileNotFoundError:
+        pass
+    with open(pad, "w", encoding="utf-8") as f:
+        f.write(inhoud)
+    return map_naam
+
+
+if __name__ == "__main__":
+    print(os.path.join(schrijf_frontend(), "index.html"))
@@ -0,0 +1,213 @@
+import os
+
+import numpy as np
+
+import dartbord_geometrie as geo
+
+# ----------------------
+# CATALOGUS (alle 82 vakken, in de volgorde van geo.VAKKEN)
+# ----------------------
+VAKKEN = geo.VAKKEN
+AANTAL_VAKKEN = len(VAKKEN)
+
+TYPES = ["Single onder", "Single boven", "Double", "Triple", "Outer Bull", "Bullseye"]
+TYPE = np.array([TYPES.index(geo.get_type(vak)) for vak in VAKKEN], dtype=np.int8)
+
+# Geschatte moeilijkheid per type (hoger = moeilijker); ook het startpunt
+# (verwacht aantal pijlen) voor de kalibratie als er nog weinig data is
+moeilijkheid_per_type = {
+    "Single onder": 1.5,
+    "Single boven": 1,
+    "Double": 3,
+    "Triple": 4,
+    "Outer Bull": 2.5,
+    "Bullseye": 5
+}
+MOEILIJKHEID = np.array([moeilijkheid_per_type[t] for t in TYPES])[TYPE]
+
+BULLS = np.array([geo.VAK_INDEX["Outer Bull"], geo.VAK_INDEX["Bullseye"]])
+
+# Aantal vakken per sessie in de app
+SESSIE_LENGTE = 20
+
+# Kalibratie: hoeveel worpen de voorafschatting 'weegt' (krimp naar het type,
+# van het vak naar het type en van de speler naar het vak)
+KRIMP_TYPE = 20
+KRIMP_VAK = 5
+KRIMP_SPELER = 5
+
+KALIBRATIE_PAD = os.path.join(".data", "dart_kalibratie.npz")
+
+_rng = np.random.default_rng()
+
+
+def moeilijkheid(vak):
+    return MOEILIJKHEID[geo.VAK_INDEX[vak]]
+
+# ----------------------
+# SESSIES TREKKEN
+# ----------------------
+def trek_sessies(aantal, lengte=SESSIE_LENGTE, verplicht=(), gewichten=None, rng=None):
+    """`aantal` sessies van `lengte` verschillende vakken als array
+    (aantal, lengte) met vakindexen, in willekeurige volgorde.
+
+    `verplicht` zit in elke sessie; de overige vakken worden zonder
+    teruglegging getrokken met kans evenredig aan `gewichten` (standaard
+    gelijk). Alles in één keer via Gumbel-top-k: per sessie een ruisrij over
+    alle vakken en daarvan de hoogste.
+    """
+    rng = _rng if rng is None else rng
+    verplicht = np.asarray(verplicht, dtype=np.int64)
+    gewichten = np.ones(AANTAL_VAKKEN) if gewichten is None else np.asarray(gewichten, dtype=float)
+    with np.errstate(divide="ignore"):
+        log_gewicht = np.log(gewichten)
+    log_gewicht[verplicht] = -np.inf
+
+    vrij = lengte - len(verplicht)
+    sleutels = log_gewicht + rng.gumbel(size=(aantal, AANTAL_VAKKEN))
+    getrokken = np.argpartition(-sleutels, vrij - 1, axis=1)[:, :vrij] if vrij else np.empty((aantal, 0), dtype=np.int64)
+    sessies = np.concatenate([np.broadcast_to(verplicht, (aantal, len(verplicht))), getrokken], axis=1)
+
+    # Volgorde binnen elke sessie schudden
+    volgorde = np.argsort(rng.random(sessies.shape), axis=1)
+    return np.take_along_axis(sessies, volgorde, axis=1)
+
+
+def standaard_verplicht(rng=None):
+    """Triple 20 en een van beide bulls, zoals in elke ronde van de app."""
+    rng = _rng if rng is None else rng
+    return [geo.VAK_INDEX["Triple 20"], int(rng.choice(BULLS))]
+
+
+def standaard_doel(scores=MOEILIJKHEID, lengte=SESSIE_LENGTE):
+    """Verwachte totale moeilijkheid van een ronde met standaard_verplicht(),
+    gemiddeld over beide bulls: één vast doel voor iedereen."""
+    triple_20 = geo.VAK_INDEX["Triple 20"]
+    totalen = []
+    for bull in BULLS:
+        rest = np.ones(AANTAL_VAKKEN, dtype=bool)
+        rest[[triple_20, bull]] = False
+        totalen.append(scores[triple_20] + scores[bull] + (lengte - 2) * scores[rest].mean())
+    return float(np.mean(totalen))
+
+
+def sessie_met_moeilijkheid(doel=None, kandidaten=2000, scores=MOEILIJKHEID, **kwargs):
+    """Sessie waarvan de totale moeilijkheid het dichtst bij `doel` ligt,
+    uit `kandidaten` getrokken sessies (`scores` per vak, standaard
+    MOEILIJKHEID). Zonder doel: het verwachte totaal van een willekeurige
+    sessie, zodat rondes onderling eerlijk zijn."""
+    sessies = trek_sessies(kandidaten, **kwargs)
+    totaal = scores[sessies].sum(axis=1)
+    if doel is None:
+        doel = totaal.mean()
+    return sessies[np.argmin(np.abs(totaal - doel))]
+
+
+def vaknamen(sessie):
+    return [VAKKEN[i] for i in sessie]
+
+# ----------------------
+# KALIBRATIE (verwacht aantal pijlen uit de geschiedenis)
+# ----------------------
+class Kalibratie:
+    """Verwacht aantal pijlen per vak en per speler x vak.
+
+    Bewaart per speler alleen som en aantal worpen per vak (twee kleine
+    int-matrices), dus nieuwe rijen optellen is genoeg om bij te werken.
+    Schattingen krimpen naar een niveau hoger als er weinig data is:
+    speler -> vak (alle spelers) -> type -> moeilijkheid_per_type.
+    De tabellen worden na een wijziging één keer opnieuw uitgerekend;
+    opzoeken is daarna een array-index.
+    """
+
+    def __init__(self):
+        self.spelers = []
+        self._speler_id = {}
+        self.som = np.zeros((0, AANTAL_VAKKEN), dtype=np.int64)
+        self.keer = np.zeros((0, AANTAL_VAKKEN), dtype=np.int64)
+        # Voortgang in de sheet, voor incrementeel bijwerken (dartkalibratie.py)
+        self.verwerkt = 0
+        self.laatste_rij = None
+        self._tabellen = None
+
+    def _id(self, naam):
+        i = self._speler_id.get(naam)
+        if i is None:
+            i = self._speler_id[naam] = len(self.spelers)
+            self.spelers.append(naam)
+        return i
+
+    def voeg_toe(self, namen, vak, aantal):
+        """Worpen toevoegen: namen (per worp), vak (indexen in VAKKEN; andere
+        waarden worden overgeslagen) en aantal pijlen."""
+        vak = np.asarray(vak, dtype=np.int64)
+        aantal = np.asarray(aantal, dtype=np.int64)
+        speler = np.array([self._id(naam) for naam in namen], dtype=np.int64)
+        bekend = (vak >= 0) & (vak < AANTAL_VAKKEN)
+        if len(self.spelers) > len(self.som):
+            extra = len(self.spelers) - len(self.som)
+            self.som = np.vstack([self.som, np.zeros((extra, AANTAL_VAKKEN), dtype=np.int64)])
+            self.keer = np.vstack([self.keer, np.zeros((extra, AANTAL_VAKKEN), dtype=np.int64)])
+        np.add.at(self.som, (speler[bekend], vak[bekend]), aantal[bekend])
+        np.add.at(self.keer, (speler[bekend], vak[bekend]), 1)
+        self._tabellen = None
+
+    def voeg_rijen_toe(self, rijen):
+        """Sheetrijen [naam, tijdstip, vak, aantal] toevoegen."""
+        rijen = [rij for rij in rijen if rij[0]]
+        self.voeg_toe(
+            [rij[0] for rij in rijen],
+            [geo.VAK_INDEX.get(rij[2], -1) for rij in rijen],
+            [int(rij[3]) for rij in rijen],
+        )
+
+    def _bereken(self):
+        som_vak, keer_vak = self.som.sum(axis=0), self.keer.sum(axis=0)
+        som_type = np.bincount(TYPE, weights=som_vak, minlength=len(TYPES))
+        keer_type = np.bincount(TYPE, weights=keer_vak, minlength=len(TYPES))
+        voor_type = np.array([moeilijkheid_per_type[t] for t in TYPES])
+        per_type = (som_type + KRIMP_TYPE * voor_type) / (keer_type + KRIMP_TYPE)
+        per_vak = (som_vak + KRIMP_VAK * per_type[TYPE]) / (keer_vak + KRIMP_VAK)
+        per_speler = (self.som + KRIMP_SPELER * per_vak) / (self.keer + KRIMP_SPELER)
+        self._tabellen = (per_vak, per_speler)
+        return self._tabellen
+
+    def verwacht_per_vak(self, naam=None):
+        """Array (82,) met het verwachte aantal pijlen per vak; voor een
+        speler als naam gegeven is (onbekende speler: het algemene)."""
+        per_vak, per_speler = self._tabellen or self._bereken()
+        i = self._speler_id.get(naam)
+        return per_vak if i is None else per_speler[i]
+
+    def verwacht(self, vak, naam=None):
+        return self.verwacht_per_vak(naam)[geo.VAK_INDEX[vak]]
+
+    # --- opslaan ---
+    def bewaar(self, pad=KALIBRATIE_PAD):
+        os.makedirs(os.path.dirname(pad) or ".", exist_ok=True)
+        tijdelijk = pad + ".tmp.npz"
+        np.savez_compressed(
+            tijdelijk,
+            spelers=np.array(self.spelers, dtype=str),
+            som=self.som.astype(np.int32),
+            keer=self.keer.astype(np.int32),
+            verwerkt=self.verwerkt,
+            laatste_rij=np.array(self.laatste_rij or [], dtype=str),
+        )
+        os.replace(tijdelijk, pad)
+
+    @classmethod
+    def laad(cls, pad=KALIBRATIE_PAD):
+        """Kalibratie uit `pad`, of een lege (valt terug op
+        moeilijkheid_per_type) als er nog geen bestand is."""
+        kalibratie = cls()
+        if not os.path.exists(pad):
+            return kalibratie
+        with np.load(pad) as data:
+            kalibratie.spelers = data["spelers"].tolist()
+            kalibratie._speler_id = {naam: i for i, naam in enumerate(kalibratie.spelers)}
+            kalibratie.som = data["som"].astype(np.int64)
+            kalibratie.keer = data["keer"].astype(np.int64)
+            kalibratie.verwerkt = int(data["verwerkt"])
+            kalibratie.laatste_rij = data["laatste_rij"].tolist() or None
+        return kalibratie
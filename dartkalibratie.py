@@ -0,0 +1,49 @@
+import argparse
+
+import dartdoelen
+import dartstatistiek
+import sheets
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+SHEET_NAAM = "Dartapp"
+TABBLAD_NAAM = "Blad1"
+
+# ----------------------
+# KALIBRATIE BIJWERKEN
+# ----------------------
+def kalibreer(sheet_naam=SHEET_NAAM, tabblad_naam=TABBLAD_NAAM,
+              pad=dartdoelen.KALIBRATIE_PAD, volledig=False):
+    """Werk de opgeslagen kalibratie bij met de rijen die sinds de vorige
+    keer in de sheet zijn bijgekomen. Is er iets aan eerdere rijen veranderd
+    (of `volledig`), dan wordt alles opnieuw geteld.
+    Geeft (de kalibratie, aantal verwerkte rijen) terug."""
+    ws = sheets.get_worksheet(sheet_naam, tabblad_naam)
+    kalibratie = dartdoelen.Kalibratie() if volledig else dartdoelen.Kalibratie.laad(pad)
+    rijen = dartstatistiek.haal_nieuwe_rijen(ws, kalibratie.verwerkt, kalibratie.laatste_rij)
+    if rijen is None:
+        kalibratie = dartdoelen.Kalibratie()
+        rijen = dartstatistiek.haal_nieuwe_rijen(ws, 0, None)
+    if rijen:
+        kalibratie.voeg_rijen_toe(rijen)
+        kalibratie.verwerkt += len(rijen)
+        kalibratie.laatste_rij = rijen[-1]
+    kalibratie.bewaar(pad)
+    return kalibratie, len(rijen)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Verwacht aantal pijlen per vak en per speler uit de dartgeschiedenis "
+                    "(vereist .streamlit/secrets.toml)."
+    )
+    parser.add_argument("--sheet", default=SHEET_NAAM)
+    parser.add_argument("--tabblad", default=TABBLAD_NAAM)
+    parser.add_argument("--pad", default=dartdoelen.KALIBRATIE_PAD)
+    parser.add_argument("--volledig", action="store_true", help="alles opnieuw tellen")
+    args = parser.parse_args()
+
+    kalibratie, aantal = kalibreer(args.sheet, args.tabblad, args.pad, args.volledig)
+    print(f"{args.pad}: {aantal} nieuwe worpen, {kalibratie.verwerkt} in totaal, "
+          f"{len(kalibratie.spelers)} spelers")
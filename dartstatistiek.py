@@ -0,0 +1,340 @@
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import dartbord_geometrie as geo
+import dartdoelen
+import sheets
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+# Om de hoeveel seconden er op nieuwe rijen in de sheet gecontroleerd wordt
+VERVERS_INTERVAL = 60
+
+# Ringtype als getal: positie in deze lijst (-1 = onbekend)
+CATEGORIEEN = ["Double", "Triple", "Single boven", "Single onder", "Outer Bull", "Bullseye"]
+
+# Sectornummer van de bulls
+BULL_SECTOR = 25
+
+
+def categorie_van(vak):
+    vak_l = vak.lower()
+    if "double" in vak_l and "bull" not in vak_l:
+        return "Double"
+    elif "triple" in vak_l:
+        return "Triple"
+    elif "boven" in vak_l:
+        return "Single boven"
+    elif "onder" in vak_l:
+        return "Single onder"
+    elif "outer bull" in vak_l:
+        return "Outer Bull"
+    elif "bullseye" in vak_l:
+        return "Bullseye"
+    return None
+
+
+def sector_van(vak):
+    if "bull" in vak.lower():
+        return BULL_SECTOR
+    nummer = re.search(r"\d+", vak)
+    return int(nummer.group()) if nummer else 0
+
+
+def haal_nieuwe_rijen(ws, verwerkt, laatste_rij):
+    """Rijen na de eerste `verwerkt` datarijen van het darttabblad. None als
+    de laatst verwerkte rij niet meer gelijk is aan `laatste_rij` (dan moet
+    alles opnieuw)."""
+    # Header is rij 1; begin bij de laatst verwerkte rij ter controle
+    vanaf = verwerkt + 1 if verwerkt else 2
+    rijen = ws.get(f"A{vanaf}:D", pad_values=True)
+    # Lege rijen aan het eind tellen niet mee
+    while rijen and not any(rijen[-1]):
+        rijen.pop()
+    if verwerkt:
+        if not rijen or rijen[0] != laatste_rij:
+            return None
+        rijen = rijen[1:]
+    return rijen
+
+
+def _voeg_posities_toe(index, sleutels, start):
+    """Rijnummers (vanaf `start`) per sleutel aan een index toevoegen."""
+    volgorde = np.argsort(sleutels, kind="stable")
+    uniek, begin = np.unique(sleutels[volgorde], return_index=True)
+    for sleutel, posities in zip(uniek.tolist(), np.split(volgorde + start, begin[1:])):
+        bestaand = index.get(sleutel)
+        index[sleutel] = posities if bestaand is None else np.concatenate([bestaand, posities])
+
+# ----------------------
+# WORPEN (kolomsgewijs, één keer geparsed)
+# ----------------------
+class Worpen:
+    """Alle worpen als getypeerde kolommen (NumPy), met opzoektabellen voor
+    speler, sessie en vak en indexen per speler en per vak.
+
+    Kolommen per worp: speler, sessie, vak (id's), sector (1-20, 25 voor de
+    bulls), ring (index in CATEGORIEEN), aantal en tijd (datetime64).
+    Per sessie: speler, tijdstip (tekst zoals in de sheet) en totaal.
+    """
+
+    def __init__(self):
+        self.spelers = []                 # id -> naam
+        self._speler_id = {}
+        self.sessie_ts = []               # id -> tijdstip (tekst)
+        self._sessie_id = {}              # (speler id, tijdstip) -> id
+        self.sessie_speler = np.empty(0, dtype=np.int32)
+        self.sessie_tijd = np.empty(0, dtype="datetime64[s]")
+        self.sessie_totaal = np.empty(0, dtype=np.int64)
+        # Vakken uit het bord staan vast op hun VAK_INDEX; onbekende namen erachter
+        self.vakken = list(geo.VAKKEN)
+        self._vak_id = dict(geo.VAK_INDEX)
+        self._vak_sector = [sector_van(vak) for vak in self.vakken]
+        self._vak_ring = [self._ring(vak) for vak in self.vakken]
+
+        self.speler = np.empty(0, dtype=np.int32)
+        self.sessie = np.empty(0, dtype=np.int32)
+        self.vak = np.empty(0, dtype=np.int16)
+        self.sector = np.empty(0, dtype=np.int8)
+        self.ring = np.empty(0, dtype=np.int8)
+        self.aantal = np.empty(0, dtype=np.int32)
+        self.tijd = np.empty(0, dtype="datetime64[s]")
+
+        self.per_speler = {}              # speler id -> rijnummers
+        self.per_vak = {}                 # vak id -> rijnummers
+
+    def __len__(self):
+        return len(self.aantal)
+
+    @staticmethod
+    def _ring(vak):
+        categorie = categorie_van(vak)
+        return CATEGORIEEN.index(categorie) if categorie is not None else -1
+
+    def _id(self, tabel, lijst, sleutel, waarde=None):
+        i = tabel.get(sleutel)
+        if i is None:
+            i = tabel[sleutel] = len(lijst)
+            lijst.append(sleutel if waarde is None else waarde)
+        return i
+
+    def _vak(self, vak):
+        i = self._vak_id.get(vak)
+        if i is None:
+            i = self._id(self._vak_id, self.vakken, vak)
+            self._vak_sector.append(sector_van(vak))
+            self._vak_ring.append(self._ring(vak))
+        return i
+
+    def voeg_toe(self, rijen):
+        """Rijen [naam, tijdstip, vak, aantal] (tekst of getal) toevoegen.
+        Rijen zonder naam worden overgeslagen."""
+        rijen = [rij for rij in rijen if rij[0]]
+        if not rijen:
+            return
+        nieuwe_sessies = len(self.sessie_ts)
+        speler = np.array([self._id(self._speler_id, self.spelers, rij[0]) for rij in rijen], dtype=np.int32)
+        sessie = np.array([
+            self._id(self._sessie_id, self.sessie_ts, (s, rij[1]), rij[1])
+            for s, rij in zip(speler.tolist(), rijen)
+        ], dtype=np.int32)
+        vak = np.array([self._vak(rij[2]) for rij in rijen], dtype=np.int16)
+        aantal = np.array([int(rij[3]) for rij in rijen], dtype=np.int32)
+
+        # Nieuwe sessies: speler en tijdstip (onleesbaar tijdstip wordt NaT)
+        sessie_speler = np.zeros(len(self.sessie_ts) - nieuwe_sessies, dtype=np.int32)
+        sessie_speler[sessie[sessie >= nieuwe_sessies] - nieuwe_sessies] = speler[sessie >= nieuwe_sessies]
+        tijd = pd.to_datetime(pd.Series(self.sessie_ts[nieuwe_sessies:], dtype=object), format="mixed", errors="coerce")
+        self.sessie_speler = np.concatenate([self.sessie_speler, sessie_speler])
+        self.sessie_tijd = np.concatenate([self.sessie_tijd, tijd.to_numpy(dtype="datetime64[s]")])
+        self.sessie_totaal = np.concatenate([self.sessie_totaal, np.zeros(len(sessie_speler), dtype=np.int64)])
+        np.add.at(self.sessie_totaal, sessie, aantal)
+
+        start = len(self)
+        self.speler = np.concatenate([self.speler, speler])
+        self.sessie = np.concatenate([self.sessie, sessie])
+        self.vak = np.concatenate([self.vak, vak])
+        self.sector = np.concatenate([self.sector, np.array(self._vak_sector, dtype=np.int8)[vak]])
+        self.ring = np.concatenate([self.ring, np.array(self._vak_ring, dtype=np.int8)[vak]])
+        self.aantal = np.concatenate([self.aantal, aantal])
+        self.tijd = np.concatenate([self.tijd, self.sessie_tijd[sessie]])
+        _voeg_posities_toe(self.per_speler, speler, start)
+        _voeg_posities_toe(self.per_vak, vak, start)
+
+    def rijen_van(self, naam):
+        i = self._speler_id.get(naam)
+        return self.per_speler.get(i, np.empty(0, dtype=np.int64))
+
+    def rijen_op(self, vak):
+        i = self._vak_id.get(vak)
+        return self.per_vak.get(i, np.empty(0, dtype=np.int64))
+
+# ----------------------
+# STATISTIEKEN (incrementeel bijgehouden)
+# ----------------------
+class Dartstatistiek:
+    """Ranglijst en statistieken per speler voor het darttabblad.
+
+    Alleen rijen die na de vorige keer in de sheet zijn bijgekomen worden
+    opgehaald en (één keer) in Worpen geparsed; de Kalibratie (verwacht
+    aantal pijlen per vak) loopt daarmee gelijk op. Staat de laatst verwerkte
+    rij er niet meer hetzelfde (rijen verwijderd of aangepast), dan wordt
+    alles opnieuw ingelezen. De ranglijst wordt per versie één keer
+    opgebouwd; de tabellen per speler zijn filters op diens rijen.
+    """
+
+    def __init__(self, sheet_naam, tabblad_naam):
+        self.sheet_naam = sheet_naam
+        self.tabblad_naam = tabblad_naam
+        self._lock = threading.Lock()
+        self._leeg()
+
+    def _leeg(self):
+        self.worpen = Worpen()
+        self.kalibratie = dartdoelen.Kalibratie()
+        self.verwerkt = 0          # aantal verwerkte sheetrijen (zonder header)
+        self.laatste_rij = None
+        self.voorlopig = set()     # (naam, tijdstip) van nog niet verstuurde sessies
+        self.versie = 0
+        self._gecontroleerd = 0.0
+        self._ranglijst = {}
+
+    def _verwerk(self, rijen):
+        w = self.worpen
+        start = len(w)
+        w.voeg_toe(rijen)
+        self.kalibratie.voeg_toe(
+            [w.spelers[i] for i in w.speler[start:].tolist()], w.vak[start:], w.aantal[start:]
+        )
+        if rijen:
+            self.versie += 1
+            self._ranglijst = {}
+
+    # --- bijwerken ---
+    def _haal_nieuwe_rijen(self):
+        ws = sheets.get_worksheet(self.sheet_naam, self.tabblad_naam)
+        return haal_nieuwe_rijen(ws, self.verwerkt, self.laatste_rij)
+
+    def bijwerken(self, forceer=False):
+        """Haal nieuwe sheetrijen op (hooguit eens per VERVERS_INTERVAL,
+        tenzij `forceer`) en verwerk ze."""
+        with self._lock:
+            if not forceer and time.monotonic() - self._gecontroleerd < VERVERS_INTERVAL:
+                return
+            rijen = self._haal_nieuwe_rijen()
+            if rijen is None:
+                # Voorlopige sessies worden bij de volgende voeg_voorlopig_toe
+                # weer meegeteld
+                self._leeg()
+                rijen = self._haal_nieuwe_rijen()
+            self._gecontroleerd = time.monotonic()
+            if not rijen:
+                return
+            self.verwerkt += len(rijen)
+            self.laatste_rij = rijen[-1]
+            # Sessies die al voorlopig meetellen niet nog een keer verwerken
+            aangekomen = {(rij[0], rij[1]) for rij in rijen} & self.voorlopig
+            self._verwerk([rij for rij in rijen if (rij[0], rij[1]) not in aangekomen])
+            self.voorlopig -= aangekomen
+
+    def voeg_voorlopig_toe(self, rijen):
+        """Rijen die nog in de schrijfbuffer staan alvast meetellen (één keer
+        per sessie); als ze later uit de sheet komen worden ze overgeslagen."""
+        with self._lock:
+            nieuw = [rij for rij in rijen if (rij[0], rij[1]) not in self.voorlopig]
+            self.voorlopig |= {(rij[0], rij[1]) for rij in nieuw}
+            self._verwerk(nieuw)
+
+    # --- tabellen ---
+    def verwacht_per_vak(self, naam=None):
+        """Verwacht aantal pijlen per vak (zie dartdoelen.Kalibratie)."""
+        with self._lock:
+            return self.kalibratie.verwacht_per_vak(naam).copy()
+
+    def namen(self):
+        with self._lock:
+            return sorted(self.worpen.spelers)
+
+    def ranglijst(self, genormaliseerd=False):
+        """Beste sessie per speler. Genormaliseerd: totaal gedeeld door het
+        verwachte totaal van precies die vakken (Kalibratie, over alle
+        spelers), zodat makkelijke en moeilijke trekkingen eerlijk
+        vergeleken worden; 1,00 = zoals verwacht, lager is beter.
+        Per versie één keer berekend."""
+        with self._lock:
+            if genormaliseerd not in self._ranglijst:
+                w = self.worpen
+                totaal = w.sessie_totaal
+                kolom = "Totaal worpen (minimaal)"
+                if genormaliseerd:
+                    # Onbekende vakken (buiten het bord) tellen als een gemiddeld vak
+                    per_vak = self.kalibratie.verwacht_per_vak()
+                    tabel = np.append(per_vak, np.full(len(w.vakken) - len(per_vak), per_vak.mean()))
+                    verwacht = np.bincount(w.sessie, weights=tabel[w.vak], minlength=len(totaal))
+                    score = totaal / np.maximum(verwacht, 1e-9)
+                    kolom = "Score (1,00 = verwacht)"
+                else:
+                    score = totaal
+                # Per speler de sessie met de laagste score
+                volgorde = np.lexsort((score, w.sessie_speler))
+                spelers, eerste = np.unique(w.sessie_speler[volgorde], return_index=True)
+                beste = volgorde[eerste]
+                df = pd.DataFrame({"Naam": [w.spelers[i] for i in spelers], kolom: score[beste]})
+                if genormaliseerd:
+                    df[kolom] = df[kolom].round(2)
+                    df["Worpen in die sessie"] = totaal[beste]
+                df = df.sort_values(kolom, kind="stable").reset_index(drop=True)
+                df.insert(0, "Positie", range(1, len(df) + 1))
+                self._ranglijst[genormaliseerd] = df
+            return self._ranglijst[genormaliseerd]
+
+    def beste_per_categorie(self, naam):
+        """Per ringtype de worp met de minste pijlen (bij gelijke stand de
+        eerste)."""
+        with self._lock:
+            w = self.worpen
+            rijen = w.rijen_van(naam)
+            ring, aantal, vak = w.ring[rijen], w.aantal[rijen], w.vak[rijen]
+            # Stabiel sorteren op (ring, aantal): de eerste per ring is de beste
+            volgorde = np.lexsort((aantal, ring))
+            ringen, eerste = np.unique(ring[volgorde], return_index=True)
+            beste = {
+                int(r): (w.vakken[vak[volgorde[i]]], int(aantal[volgorde[i]]))
+                for r, i in zip(ringen, eerste) if r >= 0
+            }
+        return pd.DataFrame(
+            [[cat, *beste.get(i, (None, None))] for i, cat in enumerate(CATEGORIEEN)],
+            columns=["Categorie", "Vak", "Aantal worpen"],
+        )
+
+    def top_sessies(self, naam, aantal=6):
+        with self._lock:
+            w = self.worpen
+            sessies = np.unique(w.sessie[w.rijen_van(naam)])
+            totalen = np.sort(w.sessie_totaal[sessies], kind="stable")[:aantal]
+        return pd.DataFrame({
+            "Positie": range(1, len(totalen) + 1),
+            "Totaal aantal worpen": totalen,
+        })
+
+    def per_vak(self, naam):
+        with self._lock:
+            w = self.worpen
+            rijen = w.rijen_van(naam)
+            vak, aantal = w.vak[rijen], w.aantal[rijen]
+            laag = np.full(len(w.vakken), np.iinfo(np.int32).max)
+            hoog = np.full(len(w.vakken), -1)
+            np.minimum.at(laag, vak, aantal)
+            np.maximum.at(hoog, vak, aantal)
+            gespeeld = np.flatnonzero(hoog >= 0)
+            namen = [w.vakken[i] for i in gespeeld]
+        return pd.DataFrame({
+            "Vak": namen,
+            "Beste worpen (min)": laag[gespeeld],
+            "Slechtste worpen (max)": hoog[gespeeld],
+        }).sort_values("Vak")
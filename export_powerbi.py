@@ -0,0 +1,210 @@
+import argparse
+import datetime as dt
+import glob
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import grootboek
+import kalender
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+SHEET_NAAM = "Boekhouding_Rick"
+TABBLAD_NAAM = "Blad1"
+
+EXPORT_MAP = os.path.join(grootboek.DATA_MAP, "powerbi")
+FEIT_MAP = "feit_transacties"           # map met deel-xxxxx.parquet (Power BI: map combineren)
+DIM_KALENDER = "dim_kalender.parquet"
+DIM_CATEGORIE = "dim_categorie.parquet"
+STADIUM = "export_stadium.json"
+
+# Snappy wordt door elke Parquet-lezer (ook Power BI) ondersteund
+COMPRESSIE = "snappy"
+
+# ----------------------
+# HULPFUNCTIES
+# ----------------------
+def _lees_stadium(map_naam):
+    try:
+        with open(os.path.join(map_naam, STADIUM), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _schrijf_stadium(map_naam, stadium):
+    pad = os.path.join(map_naam, STADIUM)
+    with open(pad + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(stadium, f)
+    os.replace(pad + ".tmp", pad)
+
+
+def _lees_grootboek(pad):
+    conn = sqlite3.connect(pad, timeout=30)
+    try:
+        df = pd.read_sql_query(
+            f"SELECT id, {', '.join(grootboek.KOLOMMEN)} FROM grootboek ORDER BY id", conn
+        )
+    finally:
+        conn.close()
+    return df
+
+
+def _vingerafdruk(df):
+    """Som van rij-hashes: verandert als er ook maar één bestaande rij anders is
+    (bv. in de sheet aangepast of verwijderd). Pushen en ophalen laten de id's
+    in grootboek.py staan, dus daarvoor blijft de export incrementeel."""
+    if df.empty:
+        return "0"
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return str(int(hashes.sum(dtype=np.uint64)))
+
+
+def transactie_id(df):
+    """Stabiele sleutel per transactie: hash van de inhoud plus het
+    volgnummer onder gelijke rijen (twee keer dezelfde koffie op één dag).
+    Hangt niet af van de SQLite-id's, die na een volledige herlaadactie of
+    een push opnieuw worden uitgedeeld."""
+    inhoud = pd.util.hash_pandas_object(df[grootboek.KOLOMMEN], index=False)
+    volgnummer = inhoud.groupby(inhoud.to_numpy()).cumcount()
+    sleutel = pd.util.hash_pandas_object(
+        pd.DataFrame({"inhoud": inhoud.to_numpy(), "volgnummer": volgnummer.to_numpy()}), index=False
+    )
+    return pd.Series(sleutel.to_numpy().view("int64"), index=df.index)
+
+
+def _schrijf_parquet(df, pad):
+    df.to_parquet(pad + ".tmp", index=False, compression=COMPRESSIE)
+    os.replace(pad + ".tmp", pad)
+
+# ----------------------
+# DIMENSIES
+# ----------------------
+def datum_sleutel(datums):
+    """Vaste sleutel jjjjmmdd per datum; hangt niet af van het kalenderbereik
+    (zoals DATUM_ID) en blijft dus gelijk tussen exports. Zonder datum blijft
+    de sleutel leeg, zodat Power BI die rijen als (Leeg) toont in plaats van
+    ze aan een niet-bestaande dag te koppelen."""
+    datums = pd.to_datetime(pd.Series(datums, copy=False))
+    sleutel = datums.dt.year * 10000 + datums.dt.month * 100 + datums.dt.day
+    return sleutel.astype("Int64")
+
+
+def categorie_dimensie(bestaand, categorieen):
+    """Categorie -> CATEGORIE_ID. Bestaande id's blijven staan, nieuwe
+    categorieën krijgen een volgend nummer."""
+    if bestaand is None:
+        bestaand = pd.DataFrame({"CATEGORIE_ID": pd.Series(dtype="int64"),
+                                 "CATEGORIE": pd.Series(dtype=object)})
+    nieuw = pd.Index(pd.unique(categorieen)).difference(bestaand["CATEGORIE"])
+    if len(nieuw):
+        volgende = int(bestaand["CATEGORIE_ID"].max()) + 1 if len(bestaand) else 1
+        bestaand = pd.concat([bestaand, pd.DataFrame({
+            "CATEGORIE_ID": np.arange(volgende, volgende + len(nieuw), dtype="int64"),
+            "CATEGORIE": list(nieuw),
+        })], ignore_index=True)
+    return bestaand
+
+
+def kalender_dimensie(eerste_datum, peildatum=None):
+    """Kalender vanaf 1 januari van het eerste transactiejaar (of de
+    standaardstart als die eerder ligt), met de vlaggen van vandaag."""
+    start = kalender.STANDAARD_START
+    if eerste_datum is not None and not pd.isna(eerste_datum):
+        start = min(start, dt.date(pd.Timestamp(eerste_datum).year, 1, 1))
+    dim = kalender.relatieve_vlaggen(kalender.maak_kalender(start), peildatum)
+    dim.insert(0, "DATUM_SLEUTEL", datum_sleutel(dim["DATUM"]))
+    return dim
+
+# ----------------------
+# FEITEN
+# ----------------------
+def feiten(rijen, categorie_dim):
+    """Grootboekrijen naar de feitentabel met sleutels naar de dimensies."""
+    categorie = rijen["Categorie"].fillna("").astype(str)
+    categorie_id = categorie.map(
+        pd.Series(categorie_dim["CATEGORIE_ID"].to_numpy(), index=categorie_dim["CATEGORIE"])
+    )
+    bedrag = rijen["Bedrag"].fillna(0).astype("int64")
+    return pd.DataFrame({
+        "TRANSACTIE_ID": rijen["TRANSACTIE_ID"],
+        "DATUM_SLEUTEL": datum_sleutel(rijen["Datum"]),
+        "CATEGORIE_ID": categorie_id.astype("int64"),
+        "BEDRAG_CENTEN": bedrag,
+        "BEDRAG": bedrag / 100,
+        "TRANSACTIETYPE": np.where(bedrag < 0, "Uitgave", "Inkomsten"),
+        "SOORT": rijen["Soort"].fillna("").astype(str),
+        "OMSCHRIJVING": rijen["Omschrijving"].fillna("").astype(str),
+    })
+
+# ----------------------
+# EXPORT
+# ----------------------
+def exporteer(pad_grootboek, map_naam=EXPORT_MAP, volledig=False, peildatum=None):
+    """Schrijf het stermodel naar `map_naam`.
+
+    Zijn er alleen rijen bijgekomen sinds de vorige export, dan wordt alleen
+    een nieuw deelbestand met die rijen aan de feitentabel toegevoegd. Is er
+    iets aan bestaande rijen veranderd, dan wordt alles opnieuw geschreven.
+    Geeft (aantal weggeschreven feitrijen, volledig ja/nee) terug.
+    """
+    feit_map = os.path.join(map_naam, FEIT_MAP)
+    os.makedirs(feit_map, exist_ok=True)
+    df = _lees_grootboek(pad_grootboek)
+    df["TRANSACTIE_ID"] = transactie_id(df)
+    df["Datum"] = pd.to_datetime(df["Datum"])
+
+    stadium = None if volledig else _lees_stadium(map_naam)
+    if stadium is not None:
+        oud = df[df["id"] <= stadium["laatste_id"]]
+        if len(oud) != stadium["aantal"] or _vingerafdruk(oud) != stadium["vingerafdruk"]:
+            stadium = None
+
+    if stadium is None:
+        for deel in glob.glob(os.path.join(feit_map, "deel-*.parquet")):
+            os.remove(deel)
+        nieuw, deel_nr = df, 0
+    else:
+        nieuw, deel_nr = df[df["id"] > stadium["laatste_id"]], stadium["delen"]
+
+    # Categorie-id's blijven ook bij een volledige export gelijk
+    pad_categorie = os.path.join(map_naam, DIM_CATEGORIE)
+    categorie_dim = pd.read_parquet(pad_categorie) if os.path.exists(pad_categorie) else None
+    categorie_dim = categorie_dimensie(categorie_dim, nieuw["Categorie"].fillna("").astype(str))
+    if not nieuw.empty or stadium is None:
+        _schrijf_parquet(feiten(nieuw, categorie_dim), os.path.join(feit_map, f"deel-{deel_nr:05d}.parquet"))
+        deel_nr += 1
+    _schrijf_parquet(categorie_dim, pad_categorie)
+    # Klein (een paar duizend dagen) en met vlaggen van vandaag: altijd vernieuwen
+    _schrijf_parquet(kalender_dimensie(df["Datum"].min(), peildatum), os.path.join(map_naam, DIM_KALENDER))
+
+    _schrijf_stadium(map_naam, {
+        "laatste_id": int(df["id"].max()) if len(df) else 0,
+        "aantal": len(df),
+        "vingerafdruk": _vingerafdruk(df),
+        "delen": deel_nr,
+    })
+    return len(nieuw), stadium is None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporteer grootboek + kalender als stermodel voor Power BI.")
+    parser.add_argument("--sheet", default=SHEET_NAAM)
+    parser.add_argument("--tabblad", default=TABBLAD_NAAM)
+    parser.add_argument("--map", default=EXPORT_MAP, help="doelmap voor de Parquet-bestanden")
+    parser.add_argument("--sync", action="store_true",
+                        help="eerst met de Google Sheet synchroniseren (vereist .streamlit/secrets.toml)")
+    parser.add_argument("--volledig", action="store_true", help="alles opnieuw schrijven")
+    args = parser.parse_args()
+
+    boek = grootboek.Grootboek(args.sheet, args.tabblad)
+    if args.sync:
+        boek.synchroniseer()
+    aantal, volledig = exporteer(boek.pad, args.map, args.volledig)
+    soort = "volledige export" if volledig else "bijgewerkt"
+    print(f"{args.map}: {aantal} transacties geschreven ({soort})")
@@ -0,0 +1,512 @@
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+from gspread.utils import numericise_all, rowcol_to_a1
+
+import bedragen
+import categorisering
+import sheets
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+KOLOMMEN = ["Datum", "Categorie", "Bedrag", "Omschrijving", "Soort"]
+
+# Oudere sheets gebruiken soms een andere kolomnaam
+KOLOM_ALIASSEN = {"Waarde": "Bedrag"}
+
+# Map waarin de lokale grootboeken bewaard worden
+DATA_MAP = ".data"
+
+# Om de hoeveel seconden de achtergrondsync met de Google Sheet draait
+SYNC_INTERVAL = 60
+
+# Maximaal aantal rijen per append_rows-aanroep (grote imports gaan in delen)
+PUSH_BATCH = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS grootboek (
+    id           INTEGER PRIMARY KEY,
+    sheet_rij    INTEGER,
+    Datum        TEXT,
+    Categorie    TEXT,
+    Bedrag       INTEGER,
+    Omschrijving TEXT,
+    Soort        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_grootboek_datum ON grootboek (Datum);
+CREATE INDEX IF NOT EXISTS idx_grootboek_categorie ON grootboek (Categorie);
+CREATE INDEX IF NOT EXISTS idx_grootboek_sheet_rij ON grootboek (sheet_rij);
+CREATE TABLE IF NOT EXISTS sync_stadium (
+    sleutel TEXT PRIMARY KEY,
+    waarde  TEXT
+);
+"""
+
+logger = logging.getLogger(__name__)
+
+# ----------------------
+# HULPFUNCTIES SHEET
+# ----------------------
+def haal_rijen(ws, header, vanaf_rij):
+    """Haal de sheetrijen vanaf `vanaf_rij` (1-based) tot het einde op."""
+    laatste_kolom = rowcol_to_a1(1, len(header))[:-1]
+    rijen = ws.get(f"A{vanaf_rij}:{laatste_kolom}", pad_values=True)
+    # Lege rijen aan het eind tellen niet mee; lege rijen ertussen wel, zodat
+    # het aantal rijen gelijk blijft aan de rijnummering in de sheet
+    while rijen and not any(cel != "" for cel in rijen[-1]):
+        rijen.pop()
+    # Korte rijen aanvullen tot de breedte van de header
+    return [numericise_all(rij + [""] * (len(header) - len(rij))) for rij in rijen]
+
+
+def _kolomnaam(naam):
+    return KOLOM_ALIASSEN.get(naam, naam)
+
+
+def _datum_naar_db(datum):
+    datum = pd.to_datetime(datum, errors='coerce')
+    return None if pd.isnull(datum) else datum.strftime("%Y-%m-%d")
+
+# ----------------------
+# INDEX VOOR DE INVOERKEUZES
+# ----------------------
+def _voeg_gesorteerd_toe(lijst, waarde):
+    i = bisect.bisect_left(lijst, waarde)
+    if i == len(lijst) or lijst[i] != waarde:
+        lijst.insert(i, waarde)
+
+
+class KeuzeIndex:
+    """Gesorteerde categorieën en omschrijvingen, plus categorie ->
+    omschrijvingen, zodat de dropdowns niet per rerun het grootboek scannen.
+    De lijsten zijn gedeeld: alleen lezen."""
+
+    def __init__(self, df, versie):
+        self.versie = versie
+        self.categorieen = sorted(df["Categorie"].dropna().astype(str).unique())
+        self.omschrijvingen = sorted(df["Omschrijving"].dropna().astype(str).unique())
+        paren = df[["Categorie", "Omschrijving"]].dropna().astype(str).drop_duplicates()
+        self.per_categorie = {
+            categorie: sorted(groep)
+            for categorie, groep in paren.groupby("Categorie")["Omschrijving"]
+        }
+
+    def omschrijvingen_bij(self, categorie):
+        return self.per_categorie.get(categorie, [])
+
+    def voeg_toe(self, categorie, omschrijving):
+        if categorie is not None:
+            _voeg_gesorteerd_toe(self.categorieen, str(categorie))
+        if omschrijving is not None:
+            _voeg_gesorteerd_toe(self.omschrijvingen, str(omschrijving))
+        if categorie is not None and omschrijving is not None:
+            _voeg_gesorteerd_toe(
+                self.per_categorie.setdefault(str(categorie), []), str(omschrijving)
+            )
+
+# ----------------------
+# LOKAAL GROOTBOEK
+# ----------------------
+class Grootboek:
+    """Lokale SQLite-kopie van een grootboek-tabblad.
+
+    De app leest en schrijft alleen lokaal; nieuwe rijen staan als 'wachtend'
+    (sheet_rij IS NULL) in de tabel tot de achtergrondsync ze met één
+    append_rows naar de Google Sheet heeft gestuurd. Nieuwe rijen in de sheet
+    worden incrementeel binnengehaald.
+
+    Bedrag staat lokaal altijd als hele centen opgeslagen. `bedrag_in_centen`
+    geeft aan hoe getallen zonder komma in de sheet gelezen moeten worden.
+    """
+
+    def __init__(self, sheet_naam, tabblad_naam, datum_formaat="%d-%m-%Y",
+                 dayfirst=True, bedrag_in_centen=True):
+        self.sheet_naam = sheet_naam
+        self.tabblad_naam = tabblad_naam
+        self.datum_formaat = datum_formaat
+        self.dayfirst = dayfirst
+        self.bedrag_in_centen = bedrag_in_centen
+        self.pad = os.path.join(DATA_MAP, f"{sheet_naam}_{tabblad_naam}.sqlite")
+        self._sync_lock = threading.Lock()
+        self._wekker = threading.Event()
+        self._index = None
+        self._categorisator = None
+        self._index_lock = threading.Lock()
+
+        os.makedirs(DATA_MAP, exist_ok=True)
+        with self._verbinding() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _verbinding(self):
+        conn = sqlite3.connect(self.pad, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _stadium(self, conn, sleutel, standaard=None):
+        rij = conn.execute(
+            "SELECT waarde FROM sync_stadium WHERE sleutel = ?", (sleutel,)
+        ).fetchone()
+        return json.loads(rij[0]) if rij else standaard
+
+    def _zet_stadium(self, conn, sleutel, waarde):
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_stadium (sleutel, waarde) VALUES (?, ?)",
+            (sleutel, json.dumps(waarde))
+        )
+
+    def _verhoog_versie(self, conn):
+        self._zet_stadium(conn, "versie", self._stadium(conn, "versie", 0) + 1)
+
+    # ----------------------
+    # LEZEN
+    # ----------------------
+    def versie(self):
+        """Loopt op bij elke wijziging; handig als cachesleutel."""
+        with self._verbinding() as conn:
+            return self._stadium(conn, "versie", 0)
+
+    def is_gesynchroniseerd(self):
+        with self._verbinding() as conn:
+            return self._stadium(conn, "header") is not None
+
+    def lees(self):
+        return _lees_grootboek(self.pad, self.versie())
+
+    def keuze_index(self):
+        """KeuzeIndex voor de huidige dataversie. Eigen toevoegingen werken de
+        index bij (zie voeg_toe); alleen na een sync wordt hij opnieuw opgebouwd."""
+        versie = self.versie()
+        with self._index_lock:
+            if self._index is None or self._index.versie != versie:
+                self._index = KeuzeIndex(self.lees(), versie)
+            return self._index
+
+    def categorisator(self):
+        """Categorisator met regels uit de huidige dataversie; wordt pas
+        opnieuw geleerd als er iets aan het grootboek veranderd is."""
+        versie = self.versie()
+        with self._index_lock:
+            if self._categorisator is None or self._categorisator.versie != versie:
+                self._categorisator = categorisering.Categorisator(self.lees(), versie)
+            return self._categorisator
+
+    def filter(self, datum_van=None, datum_tot=None, categorie=None,
+               bedrag_min=None, bedrag_max=None):
+        """Selecteer rijen via de indexen op Datum en Categorie."""
+        waar, parameters = _voorwaarden(datum_van, datum_tot, categorie, bedrag_min, bedrag_max)
+        with self._verbinding() as conn:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(KOLOMMEN)} FROM grootboek {waar} ORDER BY Datum, id",
+                conn, params=parameters
+            )
+        return _typeer_uitvoer(df)
+
+    def aantal(self, **filters):
+        """Aantal rijen dat aan de filters van filter() voldoet."""
+        waar, parameters = _voorwaarden(**filters)
+        return _tel(self.pad, self.versie(), waar, tuple(parameters))
+
+    def pagina(self, nummer=1, per_pagina=50, **filters):
+        """Eén pagina van het overzicht, nieuwste eerst. Sorteren gaat via de
+        index op Datum; er wordt nooit meer dan één pagina ingelezen."""
+        waar, parameters = _voorwaarden(**filters)
+        return _lees_pagina(self.pad, self.versie(), waar, tuple(parameters),
+                            max(int(nummer), 1), int(per_pagina))
+
+    def aantal_wachtend(self):
+        with self._verbinding() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM grootboek WHERE sheet_rij IS NULL"
+            ).fetchone()[0]
+
+    # ----------------------
+    # SCHRIJVEN
+    # ----------------------
+    def voeg_toe(self, rijen):
+        """Voeg transacties (dicts met KOLOMMEN als sleutels, Bedrag in centen)
+        lokaal toe; de achtergrondsync stuurt ze daarna in één keer naar de sheet."""
+        waarden = [
+            (_datum_naar_db(rij["Datum"]),) + tuple(rij.get(col, "") for col in KOLOMMEN[1:])
+            for rij in rijen
+        ]
+        with self._index_lock:
+            with self._verbinding() as conn:
+                oude_versie = self._stadium(conn, "versie", 0)
+                conn.executemany(
+                    f"INSERT INTO grootboek ({', '.join(KOLOMMEN)}) VALUES (?, ?, ?, ?, ?)",
+                    waarden
+                )
+                self._verhoog_versie(conn)
+            # Index alleen bijwerken als hij precies de vorige versie beschrijft
+            if self._index is not None and self._index.versie == oude_versie:
+                for rij in rijen:
+                    self._index.voeg_toe(rij.get("Categorie"), rij.get("Omschrijving"))
+                self._index.versie = oude_versie + 1
+        self._wekker.set()
+
+    # ----------------------
+    # SYNCHRONISATIE
+    # ----------------------
+    def _typeer(self, rijen, header):
+        """Ruwe sheetrijen naar tuples in de volgorde van KOLOMMEN."""
+        df = pd.DataFrame(rijen, columns=[_kolomnaam(h) for h in header])
+        df = df.loc[:, ~df.columns.duplicated()]
+        for col in KOLOMMEN:
+            if col not in df.columns:
+                df[col] = 0.0 if col == "Bedrag" else ""
+        df["Datum"] = pd.to_datetime(
+            df["Datum"], dayfirst=self.dayfirst, errors='coerce'
+        ).dt.strftime("%Y-%m-%d")
+        centen = bedragen.naar_centen(df["Bedrag"], self.bedrag_in_centen)
+        onleesbaar = centen.isna() & (df["Bedrag"].astype(str).str.strip() != "")
+        if onleesbaar.any():
+            # De sheet is de bron: niet raden, maar leeg opslaan en melden
+            logger.warning("Sheet %s: %d onleesbare bedragen (bv. %r) leeg opgeslagen",
+                           self.sheet_naam, int(onleesbaar.sum()), df.loc[onleesbaar, "Bedrag"].iloc[0])
+        df["Bedrag"] = centen
+        df = df[KOLOMMEN].astype(object)
+        return list(df.where(df.notna(), None).itertuples(index=False, name=None))
+
+    def _naar_sheet(self, rijen, header):
+        """Lokale rijen naar sheetrijen in de kolomvolgorde van de header."""
+        df = pd.DataFrame(rijen, columns=KOLOMMEN)
+        df["Datum"] = pd.to_datetime(df["Datum"]).dt.strftime(self.datum_formaat)
+        if self.bedrag_in_centen:
+            # Met komma, zodat de sheet (in elke landinstelling) hetzelfde
+            # bedrag teruggeeft als wat wij erin zetten
+            df["Bedrag"] = bedragen.centen_naar_tekst(df["Bedrag"])
+        else:
+            df["Bedrag"] = df["Bedrag"] / 100
+        df = df.astype(object).where(df.notna(), "")
+        kolommen = [_kolomnaam(h) for h in header]
+        return df.reindex(columns=kolommen, fill_value="").values.tolist()
+
+    def _pull(self, ws, verstuurd=()):
+        """Haal nieuwe sheetrijen op. De laatst bekende rij wordt mee-opgehaald
+        als controle; wijkt die af, dan wordt alles opnieuw ingelezen.
+        `verstuurd` ((sheet_rij, id)-paren van net gepushte rijen) wordt in
+        dezelfde transactie als gepusht gemarkeerd."""
+        with self._verbinding() as conn:
+            header = self._stadium(conn, "header")
+            aantal = self._stadium(conn, "aantal_rijen", 0)
+            laatste = self._stadium(conn, "laatste_rij")
+
+        if header is None:
+            header = ws.row_values(1)
+            if not header:
+                return
+
+        volledig = False
+        # Rij 1 is de header, dus de laatst bekende datarij staat op aantal + 1
+        vanaf = aantal + 1 if aantal else 2
+        rijen = haal_rijen(ws, header, vanaf)
+        if aantal:
+            if rijen and rijen[0] == laatste:
+                rijen = rijen[1:]
+                vanaf += 1
+            else:
+                logger.warning("Sheet %s is buiten de app gewijzigd; volledig herladen", self.sheet_naam)
+                header = ws.row_values(1)
+                volledig, aantal, vanaf = True, 0, 2
+                rijen = haal_rijen(ws, header, vanaf)
+
+        nieuw = self._typeer(rijen, header) if rijen else []
+        with self._verbinding() as conn:
+            conn.executemany("UPDATE grootboek SET sheet_rij = ? WHERE id = ?", verstuurd)
+            # Al gepushte rijen krijgen hun versie uit de sheet, maar houden
+            # hun id (export_powerbi werkt incrementeel op id); alleen wat echt
+            # anders is telt als wijziging
+            gewijzigd = conn.executemany(
+                f"UPDATE grootboek SET {', '.join(f'{col} = ?' for col in KOLOMMEN)} "
+                f"WHERE sheet_rij = ? AND NOT ({' AND '.join(f'{col} IS ?' for col in KOLOMMEN)})",
+                [rij + (vanaf + i,) + rij for i, rij in enumerate(nieuw)]
+            ).rowcount
+            bekend = {rij for (rij,) in conn.execute(
+                "SELECT sheet_rij FROM grootboek WHERE sheet_rij >= ?", (vanaf,)
+            )}
+            toevoegen = [(vanaf + i,) + rij for i, rij in enumerate(nieuw) if vanaf + i not in bekend]
+            conn.executemany(
+                f"INSERT INTO grootboek (sheet_rij, {', '.join(KOLOMMEN)}) VALUES (?, ?, ?, ?, ?, ?)",
+                toevoegen
+            )
+            # Rijen die niet (meer) in de sheet staan
+            gewijzigd += conn.execute(
+                "DELETE FROM grootboek WHERE sheet_rij >= ?", (vanaf + len(nieuw),)
+            ).rowcount
+            self._zet_stadium(conn, "header", header)
+            self._zet_stadium(conn, "aantal_rijen", aantal + len(rijen))
+            self._zet_stadium(conn, "laatste_rij", rijen[-1] if rijen else laatste)
+            if gewijzigd or toevoegen:
+                self._verhoog_versie(conn)
+
+    def _push(self, ws):
+        """Stuur de wachtende rijen met append_rows naar de sheet, per
+        PUSH_BATCH rijen."""
+        with self._verbinding() as conn:
+            header = self._stadium(conn, "header")
+            verwachte_rij = self._stadium(conn, "aantal_rijen", 0) + 2
+
+        while True:
+            with self._verbinding() as conn:
+                wachtend = conn.execute(
+                    f"SELECT id, {', '.join(KOLOMMEN)} FROM grootboek "
+                    "WHERE sheet_rij IS NULL ORDER BY id LIMIT ?",
+                    (PUSH_BATCH,)
+                ).fetchall()
+            if not wachtend:
+                return
+
+            if header is None:
+                # Lege sheet: eerst een header schrijven
+                header = list(KOLOMMEN)
+                ws.append_row(header, table_range="A1")
+                with self._verbinding() as conn:
+                    self._zet_stadium(conn, "header", header)
+
+            resultaat = ws.append_rows(
+                self._naar_sheet([rij[1:] for rij in wachtend], header),
+                value_input_option="USER_ENTERED",
+                table_range="A1"
+            )
+            eerste_rij = sheets.toegevoegde_rij(resultaat)
+            verstuurd = [(eerste_rij + i, rij[0]) for i, rij in enumerate(wachtend)]
+            sheets.invalideer(self.sheet_naam, self.tabblad_naam)
+            if eerste_rij != verwachte_rij:
+                # Iemand anders heeft tussendoor rijen toegevoegd: eerst die
+                # rijen ophalen en onze rijen in dezelfde transactie als
+                # gepusht markeren, zodat de rijnummers weer kloppen voordat
+                # de volgende batch gaat
+                logger.warning("Sheet %s is tussendoor aangevuld (verwacht rij %s, kreeg %s); opnieuw ingelezen",
+                               self.sheet_naam, verwachte_rij, eerste_rij)
+                try:
+                    self._pull(ws, verstuurd)
+                except Exception:
+                    # Ophalen mislukt: toch markeren (de rijen staan in de
+                    # sheet), de volgende sync leest ze opnieuw in
+                    with self._verbinding() as conn:
+                        conn.executemany("UPDATE grootboek SET sheet_rij = ? WHERE id = ?", verstuurd)
+                    raise
+                with self._verbinding() as conn:
+                    verwachte_rij = self._stadium(conn, "aantal_rijen", 0) + 2
+                continue
+            with self._verbinding() as conn:
+                conn.executemany("UPDATE grootboek SET sheet_rij = ? WHERE id = ?", verstuurd)
+            verwachte_rij = eerste_rij + len(wachtend)
+
+    def synchroniseer(self):
+        with self._sync_lock:
+            ws = sheets.get_worksheet(self.sheet_naam, self.tabblad_naam)
+            with self._verbinding() as conn:
+                heeft_header = self._stadium(conn, "header") is not None
+            if not heeft_header:
+                self._pull(ws)
+            self._push(ws)
+            self._pull(ws)
+
+    def _sync_lus(self):
+        while True:
+            try:
+                self.synchroniseer()
+            except Exception:
+                # Sheets traag of onbereikbaar: lokaal doorwerken, later opnieuw
+                logger.exception("Synchronisatie van %s mislukt", self.sheet_naam)
+            self._wekker.wait(SYNC_INTERVAL)
+            self._wekker.clear()
+
+    def start(self):
+        threading.Thread(
+            target=self._sync_lus, daemon=True, name=f"sync-{self.sheet_naam}"
+        ).start()
+
+
+def _voorwaarden(datum_van=None, datum_tot=None, categorie=None,
+                 bedrag_min=None, bedrag_max=None):
+    """WHERE-clausule en parameters. Bedragen in centen en op absolute waarde,
+    zodat 'vanaf 50 euro' zowel uitgaven als inkomsten vindt."""
+    voorwaarden, parameters = [], []
+    if datum_van is not None:
+        voorwaarden.append("Datum >= ?")
+        parameters.append(_datum_naar_db(datum_van))
+    if datum_tot is not None:
+        voorwaarden.append("Datum <= ?")
+        parameters.append(_datum_naar_db(datum_tot))
+    if categorie is not None:
+        voorwaarden.append("Categorie = ?")
+        parameters.append(categorie)
+    if bedrag_min is not None:
+        voorwaarden.append("ABS(Bedrag) >= ?")
+        parameters.append(int(bedrag_min))
+    if bedrag_max is not None:
+        voorwaarden.append("ABS(Bedrag) <= ?")
+        parameters.append(int(bedrag_max))
+    waar = f"WHERE {' AND '.join(voorwaarden)}" if voorwaarden else ""
+    return waar, parameters
+
+
+def _typeer_uitvoer(df):
+    df["Datum"] = pd.to_datetime(df["Datum"])
+    df["Bedrag"] = df["Bedrag"].fillna(0).astype("int64")
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _lees_grootboek(pad, versie):
+    conn = sqlite3.connect(pad, timeout=30)
+    try:
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(KOLOMMEN)} FROM grootboek ORDER BY id", conn
+        )
+    finally:
+        conn.close()
+    return _typeer_uitvoer(df)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _tel(pad, versie, waar, parameters):
+    conn = sqlite3.connect(pad, timeout=30)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM grootboek {waar}", parameters).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _lees_pagina(pad, versie, waar, parameters, nummer, per_pagina):
+    conn = sqlite3.connect(pad, timeout=30)
+    try:
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(KOLOMMEN)} FROM grootboek {waar} "
+            "ORDER BY Datum DESC, id DESC LIMIT ? OFFSET ?",
+            conn, params=parameters + (per_pagina, (nummer - 1) * per_pagina)
+        )
+    finally:
+        conn.close()
+    return _typeer_uitvoer(df)
+
+
+@st.cache_resource(show_spinner=False)
+def open_grootboek(sheet_naam, tabblad_naam, datum_formaat="%d-%m-%Y",
+                   dayfirst=True, bedrag_in_centen=True):
+    """Eén Grootboek (met achtergrondsync) per tabblad per proces."""
+    boek = Grootboek(sheet_naam, tabblad_naam, datum_formaat, dayfirst, bedrag_in_centen)
+    if not boek.is_gesynchroniseerd():
+        # Nog nooit gesynchroniseerd: de eerste keer wachten we op de sheet
+        try:
+            boek.synchroniseer()
+        except Exception:
+            logger.exception("Eerste synchronisatie van %s mislukt", sheet_naam)
+    boek.start()
+    return boek
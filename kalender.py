@@ -0,0 +1,281 @@
+import argparse
+import datetime as dt
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+# Zelfde standaardbereik als kalender_aanmaken.sql: vanaf 1 december 2025 tot
+# en met 31 december, vijf jaar na dit jaar
+STANDAARD_START = dt.date(2025, 12, 1)
+JAREN_VOORUIT = 5
+
+STANDAARD_PAD = os.path.join(".data", "kalender.parquet")
+TABEL_NAAM = "kalender"
+
+# SET LANGUAGE Dutch: week begint op maandag (@@DATEFIRST = 1)
+WEEKDAGEN = ["Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag"]
+MAANDEN = ["Januari", "Februari", "Maart", "April", "Mei", "Juni", "Juli",
+           "Augustus", "September", "Oktober", "November", "December"]
+MAANDEN_KORT = ["Jan", "Feb", "Mrt", "Apr", "Mei", "Jun", "Jul",
+                "Aug", "Sep", "Okt", "Nov", "Dec"]
+
+# Vlaggen ten opzichte van 'vandaag': die staan niet in de tabel maar worden
+# bij het opvragen berekend (relatieve_vlaggen / view kalender_relatief), zodat
+# de tabel niet elke dag opnieuw opgebouwd hoeft te worden
+RELATIEVE_KOLOMMEN = [
+    "IS_VORIG_JAAR", "IS_TOEKOMSTIG_JAAR", "IS_HUIDIG_JAAR", "IS_VORIGE_MAAND",
+    "IS_TOEKOMSTIGE_MAAND", "IS_HUIDIGE_MAAND", "IS_TOEKOMSTIGE_DATUM",
+    "IS_HUIDIGE_DATUM", "IS_VOORGAANDE_12_MAAND",
+]
+VIEW_NAAM = "kalender_relatief"
+
+DATUM_KOLOMMEN = [
+    "DATUM", "EERSTE_DATUM_WEEK", "LAATSTE_DATUM_WEEK", "EERSTE_DATUM_MAAND",
+    "LAATSTE_DATUM_MAAND", "EERSTE_DATUM_VOLGENDE_MAAND", "LAATSTE_DATUM_VOLGENDE_MAAND",
+    "EERSTE_DATUM_KWARTAAL", "LAATSTE_DATUM_KWARTAAL",
+]
+
+# ----------------------
+# HULPFUNCTIES
+# ----------------------
+def _tekst(getallen, breedte=0):
+    """Gehele getallen als tekst (eventueel met voorloopnullen). Er zijn maar
+    weinig verschillende waarden, dus alleen die worden geformatteerd."""
+    uniek, positie = np.unique(getallen, return_inverse=True)
+    tabel = np.array([str(getal).zfill(breedte) for getal in uniek], dtype=object)
+    return tabel[positie]
+
+
+def _maand_plus(eerste_van_maand, maanden):
+    return (eerste_van_maand.astype("datetime64[M]") + maanden).astype("datetime64[D]")
+
+
+def standaard_einde(vandaag=None):
+    vandaag = vandaag or dt.date.today()
+    return dt.date(vandaag.year + JAREN_VOORUIT, 12, 31)
+
+# ----------------------
+# KALENDER OPBOUWEN
+# ----------------------
+def maak_kalender(start=STANDAARD_START, einde=None):
+    """Datumdimensie met de vaste kolommen van dbo.kalender, in één keer
+    berekend op NumPy-arrays (geen recursie, geen FORMAT() per rij). De
+    IS_...-vlaggen ten opzichte van vandaag komen uit relatieve_vlaggen()."""
+    einde = einde or standaard_einde()
+    start = np.datetime64(pd.Timestamp(start).date(), "D")
+    einde = np.datetime64(pd.Timestamp(einde).date(), "D")
+
+    datum = np.arange(start, einde + 1, dtype="datetime64[D]")
+    index = pd.DatetimeIndex(datum)
+    jaar = index.year.to_numpy()
+    maand = index.month.to_numpy()
+    dag = index.day.to_numpy()
+    weekdag = index.dayofweek.to_numpy() + 1          # maandag = 1
+    dag_van_jaar = index.dayofyear.to_numpy()
+    kwartaal = (maand - 1) // 3 + 1
+    iso = index.isocalendar()
+    iso_week = iso["week"].to_numpy().astype(int)
+    iso_jaar = iso["year"].to_numpy().astype(int)
+
+    # DATEPART(WEEK): week 1 bevat 1 januari, weken beginnen op maandag
+    weekdag_1_jan = (weekdag - dag_van_jaar) % 7 + 1
+    week = (dag_van_jaar - 1 + weekdag_1_jan - 1) // 7 + 1
+
+    eerste_van_maand = datum.astype("datetime64[M]").astype("datetime64[D]")
+    eerste_van_kwartaal = _maand_plus(
+        datum.astype("datetime64[Y]").astype("datetime64[M]").astype("datetime64[D]"),
+        (kwartaal - 1) * 3
+    )
+    # MIN/MAX(TheDate) OVER (PARTITION BY ...) kijkt alleen binnen het bereik
+    eerste_datum_maand = np.maximum(eerste_van_maand, start)
+    laatste_datum_maand = np.minimum(_maand_plus(eerste_van_maand, 1) - 1, einde)
+    eerste_datum_kwartaal = np.maximum(eerste_van_kwartaal, start)
+    laatste_datum_kwartaal = np.minimum(_maand_plus(eerste_van_kwartaal, 3) - 1, einde)
+
+    # DENSE_RANK() OVER (PARTITION BY jaar, maand ORDER BY week): weeknummers
+    # lopen binnen een maand door, dus tellen vanaf de eerste week in het bereik
+    dag_eerste = (eerste_datum_maand - datum).astype(int) + dag_van_jaar
+    week_eerste = (dag_eerste - 1 + weekdag_1_jan - 1) // 7 + 1
+
+    periode = jaar * 12 + maand
+    schrikkeljaar = (jaar % 400 == 0) | ((jaar % 4 == 0) & (jaar % 100 != 0))
+    # ISO-week van 31 december is 53 precies als het jaar op donderdag begint,
+    # of op woensdag in een schrikkeljaar
+    heeft_53_weken = (weekdag_1_jan == 4) | ((weekdag_1_jan == 3) & schrikkeljaar)
+
+    jaar_tekst = _tekst(jaar)
+    maand_tekst = _tekst(maand, 2)
+
+    kalender = pd.DataFrame({
+        "DATUM_ID": np.arange(1, len(datum) + 1, dtype="int64"),
+        "DATUM": datum,
+        "DATUM_CHAR": _tekst(dag, 2) + "-" + maand_tekst + "-" + jaar_tekst,
+        "DAG_NR": dag,
+        "WEEKDAG_NR": weekdag,
+        "WEEKDAG_NAAM": np.asarray(WEEKDAGEN, dtype=object)[weekdag - 1],
+        "WEEK_ID": _tekst(iso_jaar) + _tekst(iso_week, 2),
+        "WEEK_NR": iso_week,
+        "WEEK_NAAM": "Week " + _tekst(iso_week),
+        "MAAND_KORT": np.asarray(MAANDEN_KORT, dtype=object)[maand - 1],
+        "MAAND_ID": jaar_tekst + maand_tekst,
+        "MAAND_NR": maand,
+        "MAANDNAAM": np.asarray(MAANDEN, dtype=object)[maand - 1],
+        "KWARTAAL_ID": jaar_tekst + _tekst(kwartaal),
+        "KWARTAAL_NR": kwartaal,
+        "KWARTAALNAAM": _tekst(kwartaal) + "e kwartaal",
+        "JAAR_NR": jaar,
+        "JAAR_NAAM": jaar_tekst,
+        "ISO_JAAR_NR": iso_jaar,
+        "PERIODE_NR": periode,
+        "ISWEEKEND": (weekdag >= 6).astype(int),
+        "EERSTE_DATUM_WEEK": datum - (weekdag - 1),
+        "LAATSTE_DATUM_WEEK": datum - (weekdag - 1) + 6,
+        "WEEKNR_IN_MAAND": week - week_eerste + 1,
+        "EERSTE_DATUM_MAAND": eerste_datum_maand,
+        "LAATSTE_DATUM_MAAND": laatste_datum_maand,
+        "EERSTE_DATUM_VOLGENDE_MAAND": _maand_plus(eerste_van_maand, 1),
+        "LAATSTE_DATUM_VOLGENDE_MAAND": _maand_plus(eerste_van_maand, 2) - 1,
+        "EERSTE_DATUM_KWARTAAL": eerste_datum_kwartaal,
+        "LAATSTE_DATUM_KWARTAAL": laatste_datum_kwartaal,
+        "IS_SCHRIKKELJAAR": schrikkeljaar.astype(int),
+        "HEEFT_53_WEKEN": heeft_53_weken.astype(int),
+        "JAAR_MAAND": jaar_tekst + maand_tekst,
+        "JAAR-MAAND": jaar_tekst + "-" + maand_tekst,
+        "M_BRON": "Python",
+        "M_DATUM_TIJD_VERVERST": pd.Timestamp.now().floor("s"),
+    })
+    return kalender
+
+
+def relatieve_vlaggen(kalender, peildatum=None):
+    """Kalender met de IS_...-kolommen ten opzichte van `peildatum` (standaard
+    vandaag), zoals GETDATE() ze in de SQL-versie gaf. Alleen vergelijkingen
+    op JAAR_NR, PERIODE_NR en DATUM, dus goedkoop genoeg om per opvraging te
+    doen."""
+    peildatum = pd.Timestamp(peildatum or dt.date.today()).normalize()
+    jaar = kalender["JAAR_NR"].to_numpy()
+    periode = kalender["PERIODE_NR"].to_numpy()
+    datum = kalender["DATUM"].to_numpy().astype("datetime64[D]")
+    maanden_terug = peildatum.year * 12 + peildatum.month - periode
+    peil_datum = np.datetime64(peildatum.date(), "D")
+
+    vlaggen = pd.DataFrame({
+        "IS_VORIG_JAAR": jaar == peildatum.year - 1,
+        "IS_TOEKOMSTIG_JAAR": jaar > peildatum.year,
+        "IS_HUIDIG_JAAR": jaar == peildatum.year,
+        "IS_VORIGE_MAAND": maanden_terug == 1,
+        "IS_TOEKOMSTIGE_MAAND": maanden_terug < 0,
+        "IS_HUIDIGE_MAAND": maanden_terug == 0,
+        "IS_TOEKOMSTIGE_DATUM": datum > peil_datum,
+        "IS_HUIDIGE_DATUM": datum == peil_datum,
+        "IS_VOORGAANDE_12_MAAND": (maanden_terug >= 1) & (maanden_terug <= 12),
+    }, index=kalender.index).astype(int)
+
+    # Zelfde kolomvolgorde als dbo.kalender: vlaggen vóór de M_-kolommen
+    vast = kalender.drop(columns=RELATIEVE_KOLOMMEN, errors="ignore")
+    meta = [col for col in vast.columns if col.startswith("M_")]
+    return pd.concat([vast.drop(columns=meta), vlaggen, vast[meta]], axis=1)
+
+
+def _view_sql():
+    peil_periode = "(CAST(strftime('%Y', 'now', 'localtime') AS INTEGER) * 12 + CAST(strftime('%m', 'now', 'localtime') AS INTEGER))"
+    peil_jaar = "CAST(strftime('%Y', 'now', 'localtime') AS INTEGER)"
+    vandaag = "date('now', 'localtime')"
+    return f"""
+        CREATE VIEW {VIEW_NAAM} AS
+        SELECT k.*,
+            JAAR_NR = {peil_jaar} - 1 AS IS_VORIG_JAAR,
+            JAAR_NR > {peil_jaar} AS IS_TOEKOMSTIG_JAAR,
+            JAAR_NR = {peil_jaar} AS IS_HUIDIG_JAAR,
+            {peil_periode} - PERIODE_NR = 1 AS IS_VORIGE_MAAND,
+            PERIODE_NR > {peil_periode} AS IS_TOEKOMSTIGE_MAAND,
+            PERIODE_NR = {peil_periode} AS IS_HUIDIGE_MAAND,
+            DATUM > {vandaag} AS IS_TOEKOMSTIGE_DATUM,
+            DATUM = {vandaag} AS IS_HUIDIGE_DATUM,
+            {peil_periode} - PERIODE_NR BETWEEN 1 AND 12 AS IS_VOORGAANDE_12_MAAND
+        FROM {TABEL_NAAM} k
+    """
+
+
+def lees(pad=STANDAARD_PAD, peildatum=None):
+    """Lees een weggeschreven kalender in, met de relatieve vlaggen van nu."""
+    extensie = os.path.splitext(pad)[1].lower()
+    if extensie == ".parquet":
+        kalender = pd.read_parquet(pad)
+    elif extensie in (".sqlite", ".db"):
+        conn = sqlite3.connect(pad)
+        try:
+            kalender = pd.read_sql_query(f"SELECT * FROM {TABEL_NAAM}", conn)
+        finally:
+            conn.close()
+    elif extensie == ".csv":
+        kalender = pd.read_csv(pad, dtype=str)
+    else:
+        raise ValueError(f"Onbekend bestandsformaat: {pad} (gebruik .parquet, .sqlite, .db of .csv)")
+    if extensie != ".parquet":
+        kalender = _typeer(kalender)
+    return relatieve_vlaggen(kalender, peildatum)
+
+
+def _typeer(kalender):
+    """Tekstkolommen uit SQLite/CSV terug naar datums en getallen."""
+    for col in DATUM_KOLOMMEN + ["M_DATUM_TIJD_VERVERST"]:
+        kalender[col] = pd.to_datetime(kalender[col])
+    for col in ["DATUM_ID", "DAG_NR", "WEEKDAG_NR", "WEEK_NR", "MAAND_NR", "KWARTAAL_NR",
+                "JAAR_NR", "ISO_JAAR_NR", "PERIODE_NR", "ISWEEKEND", "WEEKNR_IN_MAAND",
+                "IS_SCHRIKKELJAAR", "HEEFT_53_WEKEN"]:
+        kalender[col] = kalender[col].astype("int64")
+    return kalender
+
+# ----------------------
+# WEGSCHRIJVEN
+# ----------------------
+def schrijf(kalender, pad=STANDAARD_PAD):
+    """Schrijf de kalender naar Parquet, SQLite (.sqlite/.db) of CSV; het
+    formaat volgt uit de extensie. Alleen de vaste kolommen worden bewaard.
+
+    In SQLite staan datums als 'jjjj-mm-dd', net als Datum in het grootboek,
+    zodat er direct op gejoind kan worden; de view kalender_relatief geeft
+    daar de IS_...-vlaggen van het moment van opvragen bij."""
+    kalender = kalender.drop(columns=RELATIEVE_KOLOMMEN, errors="ignore")
+    map_naam = os.path.dirname(pad)
+    if map_naam:
+        os.makedirs(map_naam, exist_ok=True)
+    extensie = os.path.splitext(pad)[1].lower()
+    if extensie == ".parquet":
+        kalender.to_parquet(pad, index=False)
+    elif extensie in (".sqlite", ".db"):
+        tabel = kalender.copy()
+        for col in DATUM_KOLOMMEN:
+            tabel[col] = tabel[col].dt.strftime("%Y-%m-%d")
+        tabel["M_DATUM_TIJD_VERVERST"] = tabel["M_DATUM_TIJD_VERVERST"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        conn = sqlite3.connect(pad)
+        try:
+            with conn:
+                tabel.to_sql(TABEL_NAAM, conn, if_exists="replace", index=False)
+                conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{TABEL_NAAM}_datum ON {TABEL_NAAM}(DATUM)")
+                conn.execute(f"DROP VIEW IF EXISTS {VIEW_NAAM}")
+                conn.execute(_view_sql())
+        finally:
+            conn.close()
+    elif extensie == ".csv":
+        kalender.to_csv(pad, index=False, date_format="%Y-%m-%d")
+    else:
+        raise ValueError(f"Onbekend bestandsformaat: {pad} (gebruik .parquet, .sqlite, .db of .csv)")
+    return pad
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maak de kalendertabel (datumdimensie).")
+    parser.add_argument("pad", nargs="?", default=STANDAARD_PAD,
+                        help="doelbestand: .parquet, .sqlite/.db of .csv")
+    parser.add_argument("--van", type=dt.date.fromisoformat, default=STANDAARD_START)
+    parser.add_argument("--tot", type=dt.date.fromisoformat, default=None)
+    args = parser.parse_args()
+    kalender = maak_kalender(args.van, args.tot)
+    print(f"{len(kalender)} dagen geschreven naar {schrijf(kalender, args.pad)}")
@@ -100,28 +100,7 @@ dim AS
             ELSE 0 
         END,
         JAAR_MAAND = CONVERT(char(4), TheYear) + RIGHT('00'+CAST(TheMonth AS varchar),2),
-        [JAAR-MAAND] = CONCAT(TheYear,'-',RIGHT('00'+CAST(TheMonth AS varchar),2)),
-        IS_VORIG_JAAR = CASE WHEN YEAR(GETDATE()) = TheYear+1 THEN 1 ELSE 0 END,
-        IS_TOEKOMSTIG_JAAR = CASE WHEN YEAR(GETDATE()) < TheYear THEN 1 ELSE 0 END,
-        IS_HUIDIG_JAAR = CASE WHEN YEAR(GETDATE()) = TheYear THEN 1 ELSE 0 END,
-        IS_VORIGE_MAAND = CASE 
-            WHEN ((YEAR(GETDATE())*12)+MONTH(GETDATE())) - ((TheYear*12)+TheMonth) = 1 THEN 1 
-            ELSE 0 
-        END,
-        IS_TOEKOMSTIGE_MAAND = CASE 
-            WHEN FORMAT(TheDate,'yyyyMM') > FORMAT(GETDATE(),'yyyyMM') THEN 1 
-            ELSE 0 
-        END,
-        IS_HUIDIGE_MAAND = CASE 
-            WHEN FORMAT(TheDate,'yyyyMM') = FORMAT(GETDATE(),'yyyyMM') THEN 1 
-            ELSE 0 
-        END,
-        IS_TOEKOMSTIGE_DATUM = CASE WHEN TheDate > CAST(GETDATE() AS date) THEN 1 ELSE 0 END,
-        IS_HUIDIGE_DATUM = CASE WHEN TheDate = CAST(GETDATE() AS date) THEN 1 ELSE 0 END,
-        IS_VOORGAANDE_12_MAAND = CASE 
-            WHEN ((YEAR(GETDATE())*12)+MONTH(GETDATE())) - ((TheYear*12)+TheMonth) BETWEEN 1 AND 12 THEN 1 
-            ELSE 0 
-        END
+        [JAAR-MAAND] = CONCAT(TheYear,'-',RIGHT('00'+CAST(TheMonth AS varchar),2))
     FROM src
 )
 
@@ -134,4 +113,29 @@ INTO dbo.kalender
 FROM dim
 ORDER BY DATUM
 OPTION (MAXRECURSION 0);
-GO
\ No newline at end of file
+GO
+
+-- Vlaggen ten opzichte van vandaag staan niet in de tabel (dan zou die elke
+-- dag opnieuw opgebouwd moeten worden) maar worden bij het opvragen berekend
+CREATE OR ALTER VIEW dbo.kalender_relatief AS
+WITH peil AS
+(
+    SELECT
+        JAAR    = YEAR(GETDATE()),
+        PERIODE = (YEAR(GETDATE())*12)+MONTH(GETDATE()),
+        VANDAAG = CAST(GETDATE() AS date)
+)
+SELECT
+    k.*,
+    IS_VORIG_JAAR          = CASE WHEN k.JAAR_NR = p.JAAR - 1 THEN 1 ELSE 0 END,
+    IS_TOEKOMSTIG_JAAR     = CASE WHEN k.JAAR_NR > p.JAAR THEN 1 ELSE 0 END,
+    IS_HUIDIG_JAAR         = CASE WHEN k.JAAR_NR = p.JAAR THEN 1 ELSE 0 END,
+    IS_VORIGE_MAAND        = CASE WHEN p.PERIODE - k.PERIODE_NR = 1 THEN 1 ELSE 0 END,
+    IS_TOEKOMSTIGE_MAAND   = CASE WHEN k.PERIODE_NR > p.PERIODE THEN 1 ELSE 0 END,
+    IS_HUIDIGE_MAAND       = CASE WHEN k.PERIODE_NR = p.PERIODE THEN 1 ELSE 0 END,
+    IS_TOEKOMSTIGE_DATUM   = CASE WHEN k.DATUM > p.VANDAAG THEN 1 ELSE 0 END,
+    IS_HUIDIGE_DATUM       = CASE WHEN k.DATUM = p.VANDAAG THEN 1 ELSE 0 END,
+    IS_VOORGAANDE_12_MAAND = CASE WHEN p.PERIODE - k.PERIODE_NR BETWEEN 1 AND 12 THEN 1 ELSE 0 END
+FROM dbo.kalender k
+CROSS JOIN peil p;
+GO
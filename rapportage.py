@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ----------------------
+# AGGREGATIES (Bedrag in centen, int64)
+# ----------------------
+def _per_maand(df):
+    return df["Datum"].dt.to_period("M").dt.to_timestamp()
+
+
+def maandtotalen(df):
+    """Inkomsten, uitgaven en netto per maand."""
+    bedrag = df["Bedrag"].to_numpy()
+    totalen = pd.DataFrame({
+        "Maand": _per_maand(df),
+        "Inkomsten": np.where(bedrag > 0, bedrag, 0),
+        "Uitgaven": np.where(bedrag < 0, -bedrag, 0),
+        "Netto": bedrag,
+    }).groupby("Maand", sort=True).sum()
+    return totalen
+
+
+def per_categorie(df):
+    """Totaal, aantal en gemiddelde per categorie, grootste uitgaven eerst."""
+    overzicht = df.groupby("Categorie", sort=False)["Bedrag"].agg(
+        Totaal="sum", Aantal="size", Gemiddeld="mean"
+    )
+    overzicht["Gemiddeld"] = overzicht["Gemiddeld"].round().astype("int64")
+    return overzicht.sort_values("Totaal")
+
+
+def categorie_per_maand(df):
+    """Draaitabel maand x categorie met het netto bedrag."""
+    return df.pivot_table(
+        index=_per_maand(df), columns="Categorie", values="Bedrag",
+        aggfunc="sum", fill_value=0
+    ).rename_axis("Maand")
+
+
+def per_soort(df):
+    """Vaste lasten tegenover variabele transacties per maand."""
+    return df.pivot_table(
+        index=_per_maand(df), columns="Soort", values="Bedrag",
+        aggfunc="sum", fill_value=0
+    ).rename_axis("Maand")
+
+
+def lopend_saldo(df):
+    """Saldo aan het eind van elke dag met transacties."""
+    per_dag = df.groupby(df["Datum"].dt.normalize(), sort=True)["Bedrag"].sum()
+    return per_dag.cumsum().rename("Saldo").rename_axis("Datum").to_frame()
+
+# ----------------------
+# GECACHET PER DATAVERSIE
+# ----------------------
+@st.cache_data(show_spinner=False, max_entries=16)
+def rapport(_boek, sleutel):
+    """Alle overzichten in één keer. `sleutel` (bv. (boek.pad, boek.versie()))
+    bepaalt de cache; het grootboek wordt alleen gelezen als die mist."""
+    df = _boek.lees().dropna(subset=["Datum"])
+    df = df.assign(
+        Categorie=df["Categorie"].fillna("").astype(str),
+        Soort=df["Soort"].replace("", np.nan).fillna("Onbekend").astype(str),
+    )
+    return {
+        "maand": maandtotalen(df),
+        "categorie": per_categorie(df),
+        "categorie_per_maand": categorie_per_maand(df),
+        "soort": per_soort(df),
+        "saldo": lopend_saldo(df),
+    }
+
+
+def in_euro(tabel):
+    """Centen naar euro's voor grafieken en tabellen."""
+    return tabel / 100
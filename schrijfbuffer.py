@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import threading
+import uuid
+
+import sheets
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+# Wachttijd (seconden) na de eerste mislukte poging; verdubbelt per poging
+EERSTE_WACHTTIJD = 2
+MAX_WACHTTIJD = 300
+
+# Hoe lang voeg_toe wacht als er al een verzending loopt; daarna neemt de
+# achtergrondthread het over
+MAX_WACHTEN_OP_VERZENDING = 10
+
+logger = logging.getLogger(__name__)
+
+# ----------------------
+# WRITE-BEHIND BUFFER
+# ----------------------
+class Schrijfbuffer:
+    """Verzamelt rijen voor één tabblad en schrijft ze met één append_rows.
+
+    Elke batch (bv. één dartsessie) gaat eerst naar een lokaal journaal
+    (JSONL, één regel per batch). Pas als de sheet de rijen heeft, verdwijnt
+    de batch uit het journaal; mislukt de API, dan probeert een
+    achtergrondthread het opnieuw met oplopende wachttijd. Na een herstart
+    wordt een niet-leeg journaal gewoon verder afgewerkt.
+
+    `sleutel(rij)` bepaalt welke rijen bij elkaar horen (bv. naam +
+    tijdstip). Na een mislukte poging wordt eerst gekeken of de batch toch
+    al in de sheet staat, zodat een time-out geen dubbele rijen geeft.
+    """
+
+    def __init__(self, sheet_naam, tabblad_naam, journaal_pad, sleutel=None):
+        self.sheet_naam = sheet_naam
+        self.tabblad_naam = tabblad_naam
+        self.journaal_pad = journaal_pad
+        self.sleutel = sleutel
+        # _lock alleen voor het journaal (kort); _verzend_lock voor de API-aanroep,
+        # zodat wachtend() nooit op het netwerk hoeft te wachten
+        self._lock = threading.Lock()
+        self._verzend_lock = threading.Lock()
+        self._wekker = threading.Event()
+        self._thread = None
+        self._twijfel = False   # vorige poging mislukt: eerst controleren
+        os.makedirs(os.path.dirname(journaal_pad) or ".", exist_ok=True)
+        if self.wachtend():
+            self._twijfel = True
+            self._start()
+
+    # --- journaal ---
+    def _lees_journaal(self):
+        batches = []
+        try:
+            with open(self.journaal_pad, encoding="utf-8") as f:
+                for regel in f:
+                    try:
+                        batches.append(json.loads(regel))
+                    except json.JSONDecodeError:
+                        # Half geschreven laatste regel (stroomuitval): overslaan
+                        logger.warning("Onleesbare regel in %s overgeslagen", self.journaal_pad)
+        except FileNotFoundError:
+            pass
+        return batches
+
+    def _schrijf_journaal(self, batches):
+        tijdelijk = self.journaal_pad + ".tmp"
+        with open(tijdelijk, "w", encoding="utf-8") as f:
+            for batch in batches:
+                f.write(json.dumps(batch) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tijdelijk, self.journaal_pad)
+
+    def _voeg_toe_aan_journaal(self, batch):
+        with open(self.journaal_pad, "a", encoding="utf-8") as f:
+            f.write(json.dumps(batch) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def wachtend(self):
+        """Alle rijen die nog niet in de sheet staan."""
+        with self._lock:
+            return [rij for batch in self._lees_journaal() for rij in batch["rijen"]]
+
+    # --- schrijven ---
+    def voeg_toe(self, rijen):
+        """Zet de rijen in het journaal en probeer ze direct (één API-aanroep)
+        te versturen. Geeft True als ze in de sheet staan, False als ze
+        later door de achtergrondthread verstuurd worden."""
+        with self._lock:
+            self._voeg_toe_aan_journaal({"id": uuid.uuid4().hex, "rijen": [list(rij) for rij in rijen]})
+        try:
+            if self.leeg(timeout=MAX_WACHTEN_OP_VERZENDING):
+                return True
+            self._start()
+            return False
+        except Exception:
+            logger.exception("Versturen naar %s mislukt, later opnieuw", self.sheet_naam)
+            self._start()
+            return False
+
+    def _al_in_sheet(self, batches):
+        """Batches waarvan alle sleutels al in de sheet voorkomen."""
+        if self.sleutel is None:
+            return set()
+        aanwezig = {self.sleutel(rij) for rij in sheets.lees_waarden(self.sheet_naam, self.tabblad_naam)[1:]}
+        return {
+            batch["id"] for batch in batches
+            if all(self.sleutel(rij) in aanwezig for rij in batch["rijen"])
+        }
+
+    def leeg(self, timeout=-1):
+        """Schrijf alle batches uit het journaal met één append_rows.
+        Het journaal wordt alleen kort vergrendeld om te lezen en om de
+        verstuurde batches weg te halen, niet tijdens de API-aanroep.
+        Geeft False als er binnen `timeout` seconden al een andere
+        verzending liep (dan is er niets gedaan)."""
+        if not self._verzend_lock.acquire(timeout=timeout):
+            return False
+        try:
+            with self._lock:
+                batches = self._lees_journaal()
+                twijfel = self._twijfel
+            if not batches:
+                return True
+            verstuurd = {batch["id"] for batch in batches}
+            try:
+                if twijfel:
+                    dubbel = self._al_in_sheet(batches)
+                    batches = [batch for batch in batches if batch["id"] not in dubbel]
+                if batches:
+                    sheets.append_rows(
+                        self.sheet_naam, self.tabblad_naam,
+                        [rij for batch in batches for rij in batch["rijen"]],
+                    )
+            except Exception:
+                with self._lock:
+                    self._twijfel = True
+                raise
+            # Wat tijdens het versturen is bijgekomen blijft staan
+            with self._lock:
+                self._twijfel = False
+                self._schrijf_journaal([b for b in self._lees_journaal() if b["id"] not in verstuurd])
+            return True
+        finally:
+            self._verzend_lock.release()
+
+    # --- opnieuw proberen ---
+    def _herhaal_lus(self):
+        wachttijd = EERSTE_WACHTTIJD
+        while True:
+            self._wekker.wait(wachttijd)
+            self._wekker.clear()
+            try:
+                self.leeg()
+            except Exception:
+                logger.exception("Opnieuw versturen naar %s mislukt", self.sheet_naam)
+                wachttijd = min(wachttijd * 2, MAX_WACHTTIJD)
+                continue
+            with self._lock:
+                if not self._lees_journaal():
+                    self._thread = None
+                    return
+            wachttijd = EERSTE_WACHTTIJD
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._herhaal_lus, daemon=True, name=f"schrijfbuffer-{self.sheet_naam}"
+            )
+            self._thread.start()
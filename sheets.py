@@ -0,0 +1,113 @@
+import streamlit as st
+import gspread
+from google.oauth2.service_account import Credentials
+from gspread.utils import a1_to_rowcol, absolute_range_name
+
+# ----------------------
+# CONFIGURATIE
+# ----------------------
+SCOPE = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+# Hoe lang (in seconden) een ingelezen tabblad geldig blijft. Schrijfacties
+# via deze module maken het betreffende tabblad direct ongeldig.
+CACHE_TTL = 600
+
+# ----------------------
+# CONNECTIE (één keer per proces)
+# ----------------------
+@st.cache_resource(show_spinner=False)
+def get_client():
+    creds = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"], scopes=SCOPE
+    )
+    return gspread.authorize(creds)
+
+
+@st.cache_resource(show_spinner=False)
+def get_spreadsheet(sheet_naam):
+    return get_client().open(sheet_naam)
+
+
+@st.cache_resource(show_spinner=False)
+def get_worksheet(sheet_naam, tabblad_naam):
+    return get_spreadsheet(sheet_naam).worksheet(tabblad_naam)
+
+# ----------------------
+# LEZEN (gecachet per tabblad)
+# ----------------------
+_LEZERS = []
+
+
+def tabblad_cache(functie):
+    """Cache een leesfunctie met (sheet_naam, tabblad_naam) als eerste twee
+    argumenten, zodat invalideer() ook deze functie per tabblad leegmaakt."""
+    gecachet = st.cache_data(ttl=CACHE_TTL, show_spinner=False)(functie)
+    _LEZERS.append(gecachet)
+    return gecachet
+
+
+@tabblad_cache
+def lees_records(sheet_naam, tabblad_naam):
+    return get_worksheet(sheet_naam, tabblad_naam).get_all_records()
+
+
+@tabblad_cache
+def lees_waarden(sheet_naam, tabblad_naam):
+    return get_worksheet(sheet_naam, tabblad_naam).get_all_values()
+
+
+def invalideer(sheet_naam, tabblad_naam):
+    """Gooi alleen de gecachete inhoud van dit ene tabblad weg."""
+    for lees_functie in _LEZERS:
+        lees_functie.clear(sheet_naam, tabblad_naam)
+
+# ----------------------
+# SCHRIJVEN (invalideert het tabblad)
+# ----------------------
+def append_row(sheet_naam, tabblad_naam, rij, **kwargs):
+    try:
+        return get_worksheet(sheet_naam, tabblad_naam).append_row(rij, **kwargs)
+    finally:
+        invalideer(sheet_naam, tabblad_naam)
+
+
+def append_rows(sheet_naam, tabblad_naam, rijen, **kwargs):
+    try:
+        return get_worksheet(sheet_naam, tabblad_naam).append_rows(rijen, **kwargs)
+    finally:
+        invalideer(sheet_naam, tabblad_naam)
+
+
+def update(sheet_naam, tabblad_naam, *args, **kwargs):
+    try:
+        return get_worksheet(sheet_naam, tabblad_naam).update(*args, **kwargs)
+    finally:
+        invalideer(sheet_naam, tabblad_naam)
+
+
+def batch_update_tabbladen(sheet_naam, per_tabblad, value_input_option="RAW"):
+    """Bereiken op meerdere tabbladen in één API-aanroep (die de sheet in
+    zijn geheel wel of niet toepast); per_tabblad = {tabblad: [{"range":
+    "B2", "values": [[...]]}, ...]}."""
+    data = [
+        {"range": absolute_range_name(tabblad, cel["range"]), "values": cel["values"]}
+        for tabblad, cellen in per_tabblad.items() for cel in cellen
+    ]
+    try:
+        return get_spreadsheet(sheet_naam).values_batch_update(
+            {"valueInputOption": value_input_option, "data": data}
+        )
+    finally:
+        for tabblad in per_tabblad:
+            invalideer(sheet_naam, tabblad)
+
+
+def toegevoegde_rij(resultaat):
+    """Eerste rijnummer dat door append_row(s) beschreven is, uit het antwoord
+    van de API. Handig om te controleren of er tussendoor iemand anders rijen
+    heeft toegevoegd."""
+    bereik = resultaat["updates"]["updatedRange"].split("!")[-1]
+    return a1_to_rowcol(bereik.split(":")[0])[0]
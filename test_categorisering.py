@@ -0,0 +1,27 @@
+import pandas as pd
+
+from categorisering import Categorisator
+
+
+def _categorisator(regels):
+    return Categorisator(pd.DataFrame({
+        "Omschrijving": list(regels),
+        "Categorie": list(regels.values()),
+    }))
+
+
+def test_langste_omschrijving_wint_ook_als_kortere_eerder_staat():
+    categorisator = _categorisator({"jumbo": "Supermarkt", "albert heijn jumbo": "Boodschappen"})
+    assert categorisator.suggestie("JUMBO ALBERT HEIJN JUMBO") == "Boodschappen"
+
+
+def test_overlappende_omschrijvingen():
+    categorisator = _categorisator({"albert heijn": "Boodschappen", "heijn to go station": "Onderweg"})
+    assert categorisator.suggestie("albert heijn to go station 123") == "Onderweg"
+
+
+def test_exacte_omschrijving_en_geen_match():
+    categorisator = _categorisator({"jumbo": "Supermarkt", "jumbo kaart": "Cadeau"})
+    voorstel = categorisator.categoriseer(["Jumbo", "jumbo kaart 42", "bakker", None])
+    assert voorstel.iloc[:2].tolist() == ["Supermarkt", "Cadeau"]
+    assert voorstel.iloc[2:].isna().all()